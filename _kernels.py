@@ -0,0 +1,324 @@
+"""
+Compiled numeric kernels for Milesage - Last-Mile Optimizer
+
+Tight loops that NumPy cannot express without large temporaries are written
+here as Numba kernels. Numba is optional: without it the decorators are
+no-ops, NUMBA_AVAILABLE is False, and callers should keep using their
+vectorized NumPy paths instead of these pure-Python loops.
+"""
+
+import math
+import numpy as np
+
+try:
+    from numba import config as numba_config, njit, prange
+    # Streamlit calls kernels from its script-runner threads; the TBB layer
+    # can hang interpreter shutdown after launches from non-main threads
+    numba_config.THREADING_LAYER_PRIORITY = ["omp", "tbb", "workqueue"]
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+    prange = range
+
+    def njit(*args, **kwargs):
+        """Fallback no-op decorator used when Numba is not installed."""
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+
+        def decorator(func):
+            return func
+        return decorator
+
+
+@njit(fastmath=True, cache=True)
+def _haversine_row(lat, lon, cos_lat, radius, out, i):
+    """Fill row i right of the diagonal and mirror it into column i."""
+    out[i, i] = 0.0
+    # Row-invariant terms, including the precomputed cos(lat_i), stay in
+    # registers; only the two half-angle sines are evaluated per pair
+    lat_i = lat[i]
+    lon_i = lon[i]
+    cos_lat_i = cos_lat[i]
+    for j in range(i + 1, lat.shape[0]):
+        sin_dlat = math.sin((lat[j] - lat_i) * 0.5)
+        sin_dlon = math.sin((lon[j] - lon_i) * 0.5)
+        a = sin_dlat * sin_dlat + cos_lat_i * cos_lat[j] * sin_dlon * sin_dlon
+        # Clamp rounding overshoot for antipodal points
+        d = 2.0 * radius * math.asin(math.sqrt(min(a, 1.0)))
+        out[i, j] = d
+        out[j, i] = d
+
+
+@njit(parallel=True, fastmath=True, cache=True)
+def haversine_matrix(lat: np.ndarray, lon: np.ndarray, radius: float) -> np.ndarray:
+    """
+    Pairwise Haversine distances, parallelized over rows.
+    
+    Only the upper triangle is computed and each value is mirrored into the
+    lower one, halving the trigonometric work. Row k is paired with row
+    n-1-k so every parallel iteration covers about n pairs.
+    
+    Args:
+        lat, lon: 1-D float64 arrays of coordinates in radians
+        radius: Sphere radius (kilometers for km output)
+    
+    Returns:
+        NxN float32 array of distances (exactly symmetric, zero diagonal)
+    """
+    n = lat.shape[0]
+    cos_lat = np.cos(lat)
+    out = np.empty((n, n), dtype=np.float32)
+    
+    for k in prange((n + 1) // 2):
+        _haversine_row(lat, lon, cos_lat, radius, out, k)
+        if n - 1 - k != k:
+            _haversine_row(lat, lon, cos_lat, radius, out, n - 1 - k)
+    
+    return out
+
+
+@njit(cache=True)
+def _construct_routes(
+    distance_matrix, time_matrix, demand, service_time, earliest_time, latest_time, is_depot,
+    depot_idx, n_vehicles, use_capacity, vehicle_capacity, use_duration, max_duration_minutes,
+    depot_open, depot_close, good_enough_km, first_stops, stops, offsets,
+):
+    """
+    Build the routes into the stops/offsets buffers; returns the route count.
+    
+    Route v opens at first_stops[v] when that stop is >= 0, unvisited and
+    feasible, and at the nearest feasible stop otherwise. A scan stops early
+    at the first feasible stop within good_enough_km.
+    """
+    n = distance_matrix.shape[0]
+    unvisited = ~is_depot
+    # Travel time from every stop back to the depot as a contiguous vector,
+    # instead of a strided column read per candidate
+    time_to_depot = np.empty(n, dtype=np.float64)
+    for j in range(n):
+        time_to_depot[j] = time_matrix[j, depot_idx]
+    n_unvisited = 0
+    for j in range(n):
+        if unvisited[j]:
+            n_unvisited += 1
+    
+    pos = 0
+    n_routes = 0
+    offsets[0] = 0
+    
+    for v in range(n_vehicles):
+        if n_unvisited == 0:
+            break
+        
+        stops[pos] = depot_idx
+        pos += 1
+        current_idx = depot_idx
+        current_capacity = 0.0
+        current_time = depot_open
+        forced = first_stops[v]
+        
+        while n_unvisited > 0:
+            best_next = -1
+            best_distance = np.inf
+            best_arrival = 0.0
+            forced_ok = False
+            forced_arrival = 0.0
+            for j in range(n):
+                if not unvisited[j]:
+                    continue
+                if use_capacity and current_capacity + demand[j] > vehicle_capacity:
+                    continue
+                arrival_time = 0.0
+                if use_duration:
+                    # Wait until earliest time, then check the time window
+                    arrival_time = max(current_time + np.float64(time_matrix[current_idx, j]), earliest_time[j])
+                    if arrival_time > latest_time[j]:
+                        continue
+                    # Check if we can return to depot in time
+                    return_time = arrival_time + service_time[j] + time_to_depot[j]
+                    if return_time > depot_close or return_time - depot_open > max_duration_minutes:
+                        continue
+                if j == forced:
+                    forced_ok = True
+                    forced_arrival = arrival_time
+                dist = distance_matrix[current_idx, j]
+                if dist < best_distance:
+                    best_distance = dist
+                    best_next = j
+                    best_arrival = arrival_time
+                    # Close enough (with the default 0.0, only a duplicate
+                    # location, which is the true nearest anyway); a forced
+                    # stop further along must still be checked
+                    if best_distance <= good_enough_km and j >= forced:
+                        break
+            
+            if forced_ok:
+                best_next = forced
+                best_arrival = forced_arrival
+            forced = -1  # Only the first stop of a route can be forced
+            
+            if best_next < 0:
+                break  # No feasible next stop
+            
+            stops[pos] = best_next
+            pos += 1
+            unvisited[best_next] = False
+            n_unvisited -= 1
+            current_idx = best_next
+            if use_capacity:
+                current_capacity += demand[best_next]
+            if use_duration:
+                current_time = best_arrival + service_time[best_next]
+        
+        # Return to depot
+        stops[pos] = depot_idx
+        pos += 1
+        n_routes += 1
+        offsets[n_routes] = pos
+    
+    return n_routes
+
+
+@njit(cache=True)
+def nearest_neighbor_routes(
+    distance_matrix: np.ndarray,
+    time_matrix: np.ndarray,
+    demand: np.ndarray,
+    service_time: np.ndarray,
+    earliest_time: np.ndarray,
+    latest_time: np.ndarray,
+    is_depot: np.ndarray,
+    depot_idx: int,
+    n_vehicles: int,
+    use_capacity: bool,
+    vehicle_capacity: float,
+    use_duration: bool,
+    max_duration_minutes: float,
+    depot_open: float,
+    depot_close: float,
+    good_enough_km: float,
+):
+    """
+    Nearest-feasible-neighbor route construction, one vehicle at a time.
+    
+    Same rules as the NumPy path in vrp_solver.run_naive_solution: capacity
+    is checked if use_capacity, time windows and the return-to-depot deadline
+    if use_duration, and ties go to the lowest stop index. Not compiled with
+    fastmath, since missing time windows are passed as -inf/+inf.
+    
+    Args:
+        distance_matrix, time_matrix: NxN float32 arrays
+        demand, service_time, earliest_time, latest_time: Per-stop float64 arrays
+        is_depot: Per-stop bool array
+        depot_idx: Row of the depot all routes start and end at
+        n_vehicles: Maximum number of routes
+        use_capacity, vehicle_capacity: Capacity constraint
+        use_duration, max_duration_minutes: Duration/time-window constraints
+        depot_open, depot_close: Depot time window in minutes
+        good_enough_km: Take the first feasible stop at most this far away
+            instead of scanning for the nearest (0.0: exact nearest)
+    
+    Returns:
+        (stops, offsets): route r is stops[offsets[r]:offsets[r + 1]], depot
+        at both ends; one route per vehicle started
+    """
+    stops = np.empty(distance_matrix.shape[0] + 2 * n_vehicles, dtype=np.int64)
+    offsets = np.zeros(n_vehicles + 1, dtype=np.int64)
+    first_stops = np.full(n_vehicles, -1, dtype=np.int64)
+    n_routes = _construct_routes(
+        distance_matrix, time_matrix, demand, service_time, earliest_time, latest_time, is_depot,
+        depot_idx, n_vehicles, use_capacity, vehicle_capacity, use_duration, max_duration_minutes,
+        depot_open, depot_close, good_enough_km, first_stops, stops, offsets,
+    )
+    return stops[:offsets[n_routes]], offsets[:n_routes + 1]
+
+
+@njit(parallel=True, cache=True)
+def nearest_neighbor_multistart(
+    distance_matrix: np.ndarray,
+    time_matrix: np.ndarray,
+    demand: np.ndarray,
+    service_time: np.ndarray,
+    earliest_time: np.ndarray,
+    latest_time: np.ndarray,
+    is_depot: np.ndarray,
+    depot_idx: int,
+    n_vehicles: int,
+    use_capacity: bool,
+    vehicle_capacity: float,
+    use_duration: bool,
+    max_duration_minutes: float,
+    depot_open: float,
+    depot_close: float,
+    good_enough_km: float,
+    first_stops: np.ndarray,
+):
+    """
+    Best of several nearest-neighbor constructions, run in parallel.
+    
+    Start s opens vehicle v's route at first_stops[s, v] (-1 for the
+    nearest stop), then continues as nearest_neighbor_routes. The winner
+    serves the most stops, then has the least total distance.
+    
+    Args:
+        (as nearest_neighbor_routes)
+        first_stops: (n_starts, n_vehicles) int64 array of opening stops
+    
+    Returns:
+        (stops, offsets) of the best start, as nearest_neighbor_routes
+    """
+    n_starts = first_stops.shape[0]
+    stops = np.empty((n_starts, distance_matrix.shape[0] + 2 * n_vehicles), dtype=np.int64)
+    offsets = np.zeros((n_starts, n_vehicles + 1), dtype=np.int64)
+    n_routes = np.zeros(n_starts, dtype=np.int64)
+    n_served = np.zeros(n_starts, dtype=np.int64)
+    total_distance = np.zeros(n_starts, dtype=np.float64)
+    
+    for s in prange(n_starts):
+        routes = _construct_routes(
+            distance_matrix, time_matrix, demand, service_time, earliest_time, latest_time, is_depot,
+            depot_idx, n_vehicles, use_capacity, vehicle_capacity, use_duration, max_duration_minutes,
+            depot_open, depot_close, good_enough_km, first_stops[s], stops[s], offsets[s],
+        )
+        end = offsets[s, routes]
+        distance = 0.0
+        for k in range(end - 1):
+            distance += distance_matrix[stops[s, k], stops[s, k + 1]]
+        n_routes[s] = routes
+        n_served[s] = end - 2 * routes
+        total_distance[s] = distance
+    
+    best = 0
+    for s in range(1, n_starts):
+        if n_served[s] > n_served[best] or \
+           (n_served[s] == n_served[best] and total_distance[s] < total_distance[best]):
+            best = s
+    return stops[best, :offsets[best, n_routes[best]]].copy(), offsets[best, :n_routes[best] + 1].copy()
+
+
+def precompile() -> None:
+    """
+    Compile the kernels into Numba's on-disk cache ahead of time.
+    
+    Every kernel is declared with cache=True, so after this has run once
+    (e.g. ``python _kernels.py`` at install or launch time) later processes
+    load the machine code instead of compiling on the user's first solve.
+    """
+    if not NUMBA_AVAILABLE:
+        return
+    lat = np.zeros(2, dtype=np.float64)
+    haversine_matrix(lat, lat.copy(), 1.0)
+    
+    # Same argument types as vrp_solver.run_naive_solution passes, with the
+    # writable matrices of the CLI and the read-only cached ones of the app
+    is_depot = np.array([True, False])
+    for writeable in (True, False):
+        matrix = np.zeros((2, 2), dtype=np.float32)
+        matrix.setflags(write=writeable)
+        route_args = (matrix, matrix, lat, lat, lat, lat, is_depot, 0, 1, False, 0.0, False, np.inf, 0.0, 0.0, 0.0)
+        nearest_neighbor_routes(*route_args)
+        nearest_neighbor_multistart(*route_args, np.full((1, 1), -1, dtype=np.int64))
+
+
+if __name__ == "__main__":
+    precompile()
@@ -35,13 +35,17 @@ def auto_configure_parameters(
         - speed_kmh: Average vehicle speed (km/h)
         - use_capacity: Whether to use capacity constraints
         - use_time_windows: Whether to use time window constraints
+        - first_solution_strategy: OR-Tools first solution strategy
+        - local_search_metaheuristic: OR-Tools local search metaheuristic
+        - time_limit_seconds: Solver time limit, scaled with problem size
     """
     n_stops = len(df)
     
     # Check if demand column exists and has data
     if demand_column and demand_column in df.columns:
-        total_demand = df[demand_column].sum()
-        max_demand = df[demand_column].max()
+        # Python floats, so capacity math runs in float64 whatever the column dtype
+        total_demand = float(df[demand_column].sum())
+        max_demand = float(df[demand_column].max())
         has_demand_data = total_demand > 0
     else:
         total_demand = n_stops  # Treat each stop as demand 1
@@ -85,6 +89,10 @@ def auto_configure_parameters(
     # Average speed: urban-ish default
     avg_speed_kmh = 45
     
+    # Solver budget: guided local search keeps improving until the limit, so
+    # cap it by size (~1 s per 20 stops, 2-30 s) for predictable latency
+    time_limit_seconds = min(30, max(2, n_stops // 20))
+    
     return {
         "n_vehicles": num_vehicles,
         "vehicle_capacity": float(vehicle_capacity),
@@ -94,6 +102,9 @@ def auto_configure_parameters(
         "speed_kmh": avg_speed_kmh,
         "use_capacity": use_capacity,
         "use_time_windows": has_time_windows,
+        "first_solution_strategy": "PATH_CHEAPEST_ARC",
+        "local_search_metaheuristic": "GUIDED_LOCAL_SEARCH",
+        "time_limit_seconds": time_limit_seconds,
     }
 
 
@@ -102,7 +113,8 @@ def run_vrp_with_auto_relaxation(
     df: pd.DataFrame,
     distance_matrix,
     time_matrix,
-    initial_config: Dict
+    initial_config: Dict,
+    initial_routes: Optional[list] = None
 ) -> tuple:
     """
     Run VRP solver with automatic constraint relaxation if infeasible.
@@ -113,6 +125,10 @@ def run_vrp_with_auto_relaxation(
         distance_matrix: Distance matrix
         time_matrix: Time matrix
         initial_config: Initial configuration dictionary
+        initial_routes: Optional warm-start routes (e.g. the naive solution's
+            'routes') passed to every attempt. Relaxation only loosens
+            constraints, so routes that fit an earlier attempt still fit
+            the later ones.
     
     Returns:
         Tuple of (solution_dict, final_config_dict, relaxation_info)
@@ -123,19 +139,31 @@ def run_vrp_with_auto_relaxation(
     config = initial_config.copy()
     relaxation_info = None
     
+    # Only pass the warm start when there is one, so solver functions
+    # without the keyword keep working
+    warm_start = {'initial_routes': initial_routes} if initial_routes else {}
+    
+    # Solver settings that no relaxation step touches
+    n_vehicles = config['n_vehicles']
+    first_solution_strategy = config.get('first_solution_strategy', 'PATH_CHEAPEST_ARC')
+    local_search_metaheuristic = config.get('local_search_metaheuristic', 'GUIDED_LOCAL_SEARCH')
+    time_limit_seconds = config.get('time_limit_seconds', 30)
+    
     # Helper to run solver with current config
     def try_solve():
+        capacity = config.get('vehicle_capacity') if config.get('use_capacity') else None
         return run_ortools_func(
             df,
             distance_matrix,
             time_matrix,
-            config['n_vehicles'],
-            config.get('vehicle_capacity') if config.get('use_capacity') else None,
+            n_vehicles,
+            capacity,
             config.get('max_route_duration_hours'),
             config.get('depot_time_window', (480, 1200)),
-            config.get('first_solution_strategy', 'PATH_CHEAPEST_ARC'),
-            config.get('local_search_metaheuristic', 'GUIDED_LOCAL_SEARCH'),
-            config.get('time_limit_seconds', 30)
+            first_solution_strategy,
+            local_search_metaheuristic,
+            time_limit_seconds,
+            **warm_start
         )
     
     # 1) Try with given config
@@ -143,34 +171,35 @@ def run_vrp_with_auto_relaxation(
     if 'error' not in solution:
         return solution, config, None
     
-    # 2) Relax capacity (if in use)
+    # 2) Relax capacity (if in use). One solve at the loosest factor costs
+    # a single time limit where stepping through 1.5x/2x/3x could cost three
     if config.get('use_capacity', False) and config.get('vehicle_capacity'):
         original_capacity = config['vehicle_capacity']
-        for factor in [1.5, 2.0, 3.0]:
-            config['vehicle_capacity'] = original_capacity * factor
-            solution = try_solve()
-            if 'error' not in solution:
-                relaxation_info = {
-                    'relaxed': True,
-                    'capacity_factor': factor,
-                    'new_capacity': config['vehicle_capacity'],
-                    'max_route_hours': config.get('max_route_duration_hours'),
-                }
-                return solution, config, relaxation_info
-    
+        factor = 3.0
+        config['vehicle_capacity'] = original_capacity * factor
+        solution = try_solve()
+        if 'error' not in solution:
+            relaxation_info = {
+                'relaxed': True,
+                'capacity_factor': factor,
+                'new_capacity': config['vehicle_capacity'],
+                'max_route_hours': config.get('max_route_duration_hours'),
+            }
+            return solution, config, relaxation_info
+        
         # Reset capacity for next step
         config['vehicle_capacity'] = original_capacity
     
     # 3) Relax time / hours
     original_max_hours = config.get('max_route_duration_hours', 9.0)
     original_close_hour = config.get('depot_close_hour', 18)
-    depot_open = config.get('depot_open_hour', 8)
+    depot_open_minutes = config.get('depot_open_hour', 8) * 60
     
     for extra_hours in [2, 4, 6]:
         config['max_route_duration_hours'] = original_max_hours + extra_hours
         new_close_hour = min(23, original_close_hour + extra_hours)
         config['depot_close_hour'] = new_close_hour
-        config['depot_time_window'] = (depot_open * 60, new_close_hour * 60)
+        config['depot_time_window'] = (depot_open_minutes, new_close_hour * 60)
         
         solution = try_solve()
         if 'error' not in solution:
@@ -188,7 +217,7 @@ def run_vrp_with_auto_relaxation(
     config['use_time_windows'] = False
     config['max_route_duration_hours'] = original_max_hours + 6  # Keep the extra hours
     config['depot_close_hour'] = min(23, original_close_hour + 6)
-    config['depot_time_window'] = (depot_open * 60, config['depot_close_hour'] * 60)
+    config['depot_time_window'] = (depot_open_minutes, config['depot_close_hour'] * 60)
     
     solution = try_solve()
     if 'error' not in solution:
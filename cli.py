@@ -6,14 +6,15 @@ Usage:
 """
 
 import argparse
+import numpy as np
 import pandas as pd
 import sys
 from pathlib import Path
 
 # Import core modules
 try:
-    from data_utils import normalize_dataframe, build_distance_matrix, build_time_matrix
-    from vrp_solver import run_ortools_solution
+    from data_utils import normalize_dataframe, load_or_build_distance_matrix, build_time_matrix
+    from vrp_solver import run_naive_solution, run_ortools_solution, run_multistart_solution
     from auto_config import auto_configure_parameters
 except ImportError as e:
     print(f"Error importing modules: {e}")
@@ -21,6 +22,48 @@ except ImportError as e:
     sys.exit(1)
 
 
+def read_mapped_columns(path: Path, id_col: str, lat_col: str, lon_col: str) -> pd.DataFrame:
+    """
+    Read only the stop ID and coordinate columns of a CSV.
+    
+    With polars installed, the file is scanned lazily and the column
+    selection is pushed down into the scan, so the other columns are never
+    parsed. Otherwise pandas reads the same projection via usecols.
+    
+    Args:
+        path: CSV file path
+        id_col, lat_col, lon_col: Column names to load
+    
+    Returns:
+        DataFrame with the ID column as str and coordinates as float64
+    """
+    columns = list(dict.fromkeys([id_col, lat_col, lon_col]))
+    dtypes = {id_col: str, lat_col: 'float64', lon_col: 'float64'}
+    
+    try:
+        import polars as pl
+    except ImportError:
+        pl = None
+    
+    if pl is not None:
+        try:
+            return (
+                pl.scan_csv(
+                    path,
+                    schema_overrides={id_col: pl.String, lat_col: pl.Float64, lon_col: pl.Float64},
+                )
+                .select(columns)
+                .collect()
+                .to_pandas()
+                .astype(dtypes)
+            )
+        except (pl.exceptions.PolarsError, ValueError):
+            # Inferred schema does not fit the whole file, etc.
+            pass
+    
+    return pd.read_csv(path, usecols=columns, dtype=dtypes)
+
+
 def main():
     parser = argparse.ArgumentParser(
         description="Milesage VRP Optimizer - Command Line Interface",
@@ -29,11 +72,12 @@ def main():
 Examples:
   python cli.py --input data.csv --lat latitude --lon longitude --id stop_id --output routes.csv
   python cli.py --input data.csv --lat lat --lon lon --id id --output routes.csv --vehicles 5
+  python cli.py --input data.csv --lat lat --lon lon --id id --output routes.parquet
         """
     )
     
     parser.add_argument('--input', type=str, required=True, help='Input CSV file path')
-    parser.add_argument('--output', type=str, required=True, help='Output CSV file path for routes')
+    parser.add_argument('--output', type=str, required=True, help='Output file path for routes (.csv, or .parquet for Parquet)')
     parser.add_argument('--lat', type=str, required=True, help='Latitude column name')
     parser.add_argument('--lon', type=str, required=True, help='Longitude column name')
     parser.add_argument('--id', type=str, required=True, help='Stop ID column name')
@@ -41,6 +85,8 @@ Examples:
     parser.add_argument('--capacity', type=float, default=None, help='Vehicle capacity (optional)')
     parser.add_argument('--speed', type=float, default=40.0, help='Average speed in km/h (default: 40)')
     parser.add_argument('--max-hours', type=float, default=8.0, help='Max route duration in hours (default: 8)')
+    parser.add_argument('--multi-start', action='store_true', help='Run one first solution strategy per CPU core (up to 4) in parallel and keep the best')
+    parser.add_argument('--cache-dir', type=str, default=None, help='Directory for cached distance matrices (default: $MILESAGE_CACHE_DIR or ~/.milesage_cache)')
     
     args = parser.parse_args()
     
@@ -51,19 +97,28 @@ Examples:
         sys.exit(1)
     
     try:
-        df = pd.read_csv(input_path)
-        print(f"✅ Loaded {len(df)} rows from {args.input}")
+        # Read only the header first so missing columns can be reported
+        header = pd.read_csv(input_path, nrows=0)
     except Exception as e:
         print(f"Error reading input file: {e}")
         sys.exit(1)
     
     # Check required columns
     for col_name, col_arg in [('lat', args.lat), ('lon', args.lon), ('stop_id', args.id)]:
-        if col_arg not in df.columns:
+        if col_arg not in header.columns:
             print(f"Error: Column '{col_arg}' not found in input file.")
-            print(f"Available columns: {', '.join(df.columns)}")
+            print(f"Available columns: {', '.join(header.columns)}")
             sys.exit(1)
     
+    try:
+        # Load just the mapped columns with explicit dtypes; other columns
+        # are never used by the CLI and would only inflate memory
+        df = read_mapped_columns(input_path, args.id, args.lat, args.lon)
+        print(f"✅ Loaded {len(df)} rows from {args.input}")
+    except Exception as e:
+        print(f"Error reading input file: {e}")
+        sys.exit(1)
+    
     # Build column mapping
     column_mapping = {
         'stop_id': args.id,
@@ -90,7 +145,9 @@ Examples:
     # Build distance and time matrices
     print("🔄 Building distance matrix...")
     try:
-        distance_matrix = build_distance_matrix(normalized_df)
+        # Reruns on the same stops (e.g. trying other fleet sizes) load the
+        # distance matrix from disk; the time matrix is one multiply away
+        distance_matrix = load_or_build_distance_matrix(normalized_df, cache_dir=args.cache_dir)
         time_matrix = build_time_matrix(distance_matrix, args.speed)
         print(f"✅ Built matrices: {len(normalized_df)}x{len(normalized_df)}")
     except Exception as e:
@@ -111,24 +168,37 @@ Examples:
     config['speed_kmh'] = args.speed
     config['max_route_duration_hours'] = args.max_hours
     config['depot_time_window'] = (480, 1200)  # 8:00-20:00
-    config['first_solution_strategy'] = 'PATH_CHEAPEST_ARC'
-    config['local_search_metaheuristic'] = 'GUIDED_LOCAL_SEARCH'
-    config['time_limit_seconds'] = 30
     
     # Run optimization
     print("🔄 Running optimization...")
     try:
-        solution = run_ortools_solution(
+        vehicle_capacity = config['vehicle_capacity'] if config.get('use_capacity', False) else None
+        
+        # Nearest-neighbor routes take milliseconds to build and seed OR-Tools'
+        # search; the solver drops them if they break a constraint
+        naive_solution = run_naive_solution(
             normalized_df,
             distance_matrix,
             time_matrix,
             config['n_vehicles'],
-            config['vehicle_capacity'] if config.get('use_capacity', False) else None,
+            vehicle_capacity,
+            config['max_route_duration_hours'],
+            config['depot_time_window'],
+        )
+        
+        solver_func = run_multistart_solution if args.multi_start else run_ortools_solution
+        solution = solver_func(
+            normalized_df,
+            distance_matrix,
+            time_matrix,
+            config['n_vehicles'],
+            vehicle_capacity,
             config['max_route_duration_hours'],
             config['depot_time_window'],
             config['first_solution_strategy'],
             config['local_search_metaheuristic'],
-            config['time_limit_seconds']
+            config['time_limit_seconds'],
+            initial_routes=naive_solution.get('routes') or None
         )
         
         if 'error' in solution:
@@ -143,30 +213,43 @@ Examples:
         print(f"Error running optimization: {e}")
         sys.exit(1)
     
-    # Export routes to CSV
+    # Export routes (CSV or Parquet)
     print("🔄 Exporting routes...")
     try:
-        route_rows = []
+        # Gather each route's stop attributes from plain arrays, one
+        # positional take per route instead of a row lookup per stop
+        n_stops = len(normalized_df)
+        stop_ids = normalized_df['stop_id'].to_numpy()
+        lats = normalized_df['lat'].to_numpy()
+        lons = normalized_df['lon'].to_numpy()
+        is_depot = normalized_df['is_depot'].to_numpy()
+        
+        columns = {name: [] for name in ('vehicle_id', 'stop_sequence', 'stop_id', 'latitude', 'longitude',
+                                         'is_depot', 'route_distance_km', 'route_duration_minutes')}
         for route_detail in solution.get('route_details', []):
-            vehicle_id = route_detail.get('vehicle_id', 'Unknown')
-            stops = route_detail.get('stops', [])
+            stops = route_detail['stops']
+            sequence = np.flatnonzero(stops < n_stops)
+            idx = stops[sequence]
             
-            for seq_idx, stop_idx in enumerate(stops):
-                if stop_idx < len(normalized_df):
-                    stop_row = normalized_df.iloc[stop_idx]
-                    route_rows.append({
-                        'vehicle_id': vehicle_id,
-                        'stop_sequence': seq_idx,
-                        'stop_id': stop_row.get('stop_id', ''),
-                        'latitude': stop_row.get('lat', 0),
-                        'longitude': stop_row.get('lon', 0),
-                        'is_depot': stop_row.get('is_depot', False),
-                        'route_distance_km': route_detail.get('distance', 0),
-                        'route_duration_minutes': route_detail.get('time', 0),
-                    })
+            columns['vehicle_id'].append(np.full(len(idx), route_detail.get('vehicle_id', 'Unknown'), dtype=object))
+            columns['stop_sequence'].append(sequence)
+            columns['stop_id'].append(stop_ids[idx])
+            columns['latitude'].append(lats[idx])
+            columns['longitude'].append(lons[idx])
+            columns['is_depot'].append(is_depot[idx])
+            columns['route_distance_km'].append(np.full(len(idx), route_detail.get('distance', 0)))
+            columns['route_duration_minutes'].append(np.full(len(idx), route_detail.get('time', 0)))
         
-        routes_df = pd.DataFrame(route_rows)
-        routes_df.to_csv(args.output, index=False)
+        routes_df = pd.DataFrame(
+            {name: np.concatenate(parts) for name, parts in columns.items()}
+            if columns['stop_id'] else {}
+        )
+        if Path(args.output).suffix.lower() == '.parquet':
+            # Columnar and compressed: much faster to write and read back
+            # than CSV for large exports (needs pyarrow)
+            routes_df.to_parquet(args.output, engine='pyarrow', compression='snappy', index=False)
+        else:
+            routes_df.to_csv(args.output, index=False)
         print(f"✅ Routes exported to {args.output}")
         print(f"   Total routes: {len(solution['route_details'])}")
     except Exception as e:
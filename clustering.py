@@ -5,10 +5,17 @@ Clustering utilities for multi-depot and region-based routing.
 import pandas as pd
 import numpy as np
 from typing import Optional, Dict, Tuple
-from sklearn.cluster import KMeans
 
+# Above this many points, K-means runs on mini-batches
+MINIBATCH_MIN_POINTS = 2000
 
-def apply_kmeans_clustering(df: pd.DataFrame, n_clusters: int, seed: int = 42) -> pd.DataFrame:
+
+def apply_kmeans_clustering(
+    df: pd.DataFrame,
+    n_clusters: int,
+    seed: int = 42,
+    inplace: bool = False
+) -> pd.DataFrame:
     """
     Apply K-means clustering on lat/lon coordinates.
     
@@ -16,71 +23,91 @@ def apply_kmeans_clustering(df: pd.DataFrame, n_clusters: int, seed: int = 42) -
         df: DataFrame with 'lat' and 'lon' columns
         n_clusters: Number of clusters (K)
         seed: Random seed for reproducibility
+        inplace: Add 'cluster_id' and depot markers to df itself instead of
+            a new DataFrame
         
     Returns:
-        DataFrame with added 'cluster_id' column
+        DataFrame with added 'cluster_id' column (df itself if inplace)
     """
-    df_clustered = df.copy()
-    
-    # Extract coordinates
-    coords = df_clustered[['lat', 'lon']].values
-    
-    # Apply K-means
-    kmeans = KMeans(n_clusters=n_clusters, random_state=seed, n_init=10)
-    cluster_labels = kmeans.fit_predict(coords)
-    
-    df_clustered['cluster_id'] = cluster_labels
-    
-    # Find depot for each cluster (closest to centroid)
-    for cluster_id in range(n_clusters):
-        cluster_mask = df_clustered['cluster_id'] == cluster_id
-        cluster_coords = coords[cluster_mask]
-        centroid = kmeans.cluster_centers_[cluster_id]
-        
-        if len(cluster_coords) > 0:
-            # Calculate distances to centroid
-            distances = np.sqrt(
-                np.sum((cluster_coords - centroid) ** 2, axis=1)
-            )
-            closest_idx = np.argmin(distances)
-            
-            # Get the actual index in the dataframe
-            cluster_indices = df_clustered.index[cluster_mask].tolist()
-            closest_df_idx = cluster_indices[closest_idx]
-            
-            # Mark as depot if not already
-            df_clustered.loc[closest_df_idx, 'is_depot'] = True
+    # sklearn (and scipy behind it) takes a noticeable time to import, so it
+    # is only loaded when clustering actually runs
+    from sklearn.cluster import KMeans, MiniBatchKMeans
+    
+    # Extract coordinates (float32 is ample for grouping and halves the data)
+    coords = df[['lat', 'lon']].to_numpy(dtype=np.float32)
+    
+    # Apply K-means; large inputs use mini-batches, which scale linearly
+    # with far fewer full passes over the points
+    if len(coords) < MINIBATCH_MIN_POINTS:
+        kmeans = KMeans(n_clusters=n_clusters, random_state=seed, n_init=10)
+    else:
+        kmeans = MiniBatchKMeans(
+            n_clusters=n_clusters,
+            random_state=seed,
+            n_init=3,
+            batch_size=1024,
+            max_iter=100,
+        )
+    # int32 labels whatever the sklearn version returns; no copy if already int32
+    cluster_labels = kmeans.fit_predict(coords).astype(np.int32, copy=False)
+    
+    if inplace:
+        df['cluster_id'] = cluster_labels
+        df_clustered = df
+    else:
+        df_clustered = df.assign(cluster_id=cluster_labels)
+    
+    # Find depot for each cluster (closest to centroid): squared distance of
+    # every point to its own centroid, then the first minimum per cluster.
+    # A stable sort by (cluster, distance) puts each cluster's closest point
+    # at the cluster's offset; empty clusters have no offset and are skipped.
+    offsets = coords - kmeans.cluster_centers_[cluster_labels]
+    sq_distances = np.einsum('ij,ij->i', offsets, offsets)
+    order = np.lexsort((sq_distances, cluster_labels))
+    counts = np.bincount(cluster_labels, minlength=n_clusters)
+    starts = np.cumsum(counts) - counts
+    depot_positions = order[starts[counts > 0]]
+    
+    # Mark as depot (leaves existing depot markers in place)
+    df_clustered.loc[df_clustered.index[depot_positions], 'is_depot'] = True
     
     return df_clustered
 
 
-def apply_column_based_clustering(df: pd.DataFrame, cluster_column: str) -> pd.DataFrame:
+def apply_column_based_clustering(
+    df: pd.DataFrame,
+    cluster_column: str,
+    inplace: bool = False
+) -> pd.DataFrame:
     """
     Create clusters based on an existing column (e.g., region, depot_id).
     
     Args:
         df: DataFrame
         cluster_column: Column name to use for clustering
+        inplace: Add 'cluster_id' and depot markers to df itself instead of
+            a new DataFrame
         
     Returns:
-        DataFrame with added 'cluster_id' column (numeric mapping of cluster_column values)
+        DataFrame with added 'cluster_id' column (numeric mapping of cluster_column values);
+        df itself if inplace
     """
-    df_clustered = df.copy()
-    
-    # Map unique values to numeric cluster IDs
-    unique_values = df_clustered[cluster_column].unique()
-    value_to_cluster = {val: idx for idx, val in enumerate(sorted(unique_values))}
+    # Map unique values to numeric cluster IDs (position in sorted order),
+    # encoded in one hashing pass
+    values = df[cluster_column]
+    cluster_ids = pd.Categorical(values, categories=sorted(values.unique())).codes.astype(np.int32)
     
-    df_clustered['cluster_id'] = df_clustered[cluster_column].map(value_to_cluster)
+    if inplace:
+        df['cluster_id'] = cluster_ids
+        df_clustered = df
+    else:
+        df_clustered = df.assign(cluster_id=cluster_ids)
     
     # For each cluster, mark the first row as depot (or keep existing depot markers)
-    for cluster_id in df_clustered['cluster_id'].unique():
-        cluster_mask = df_clustered['cluster_id'] == cluster_id
-        
-        # If no depot exists in cluster, mark first row as depot
-        if not df_clustered.loc[cluster_mask, 'is_depot'].any():
-            first_idx = df_clustered.index[cluster_mask][0]
-            df_clustered.loc[first_idx, 'is_depot'] = True
+    cluster_col = df_clustered['cluster_id']
+    has_depot = df_clustered['is_depot'].groupby(cluster_col, sort=False).transform('any').to_numpy(dtype=bool)
+    first_row = ~cluster_col.duplicated().to_numpy()
+    df_clustered.loc[first_row & ~has_depot, 'is_depot'] = True
     
     return df_clustered
 
@@ -102,8 +129,10 @@ def split_dataframe_by_cluster(df: pd.DataFrame) -> Dict[int, pd.DataFrame]:
         clusters[0] = df.copy()
         return clusters
     
-    for cluster_id in sorted(df['cluster_id'].unique()):
-        clusters[cluster_id] = df[df['cluster_id'] == cluster_id].copy().reset_index(drop=True)
+    # One hash partition instead of a boolean mask per cluster; each group
+    # is already a new frame, so reset_index needs no copy in front of it
+    for cluster_id, cluster_df in df.groupby('cluster_id', sort=True, observed=True):
+        clusters[cluster_id] = cluster_df.reset_index(drop=True)
     
     return clusters
 
@@ -118,26 +147,21 @@ def aggregate_cluster_solutions(cluster_solutions: Dict[int, Dict]) -> Dict:
     Returns:
         Aggregated solution dictionary
     """
-    total_distance = 0
-    total_time = 0
-    total_vehicles = 0
-    all_route_details = []
-    
-    for cluster_id, solution in cluster_solutions.items():
-        if 'error' in solution:
-            continue
-        
-        total_distance += solution.get('total_distance', 0)
-        total_time += solution.get('total_time', 0)
-        total_vehicles += solution.get('n_vehicles_used', 0)
-        
-        # Prefix vehicle IDs with cluster ID
-        for route_detail in solution.get('route_details', []):
-            route_copy = route_detail.copy()
-            original_vehicle_id = route_copy.get('vehicle_id', 0)
-            route_copy['vehicle_id'] = f"C{cluster_id}-V{original_vehicle_id}"
-            route_copy['cluster_id'] = cluster_id
-            all_route_details.append(route_copy)
+    solved = {cid: sol for cid, sol in cluster_solutions.items() if 'error' not in sol}
+    
+    total_distance = sum(sol.get('total_distance', 0) for sol in solved.values())
+    total_time = sum(sol.get('total_time', 0) for sol in solved.values())
+    total_vehicles = sum(sol.get('n_vehicles_used', 0) for sol in solved.values())
+    
+    # Prefix vehicle IDs with cluster ID; each route becomes one new dict
+    # (the input solutions are left untouched)
+    all_route_details = [
+        {**route_detail,
+         'vehicle_id': f"C{cluster_id}-V{route_detail.get('vehicle_id', 0)}",
+         'cluster_id': cluster_id}
+        for cluster_id, solution in solved.items()
+        for route_detail in solution.get('route_details', [])
+    ]
     
     return {
         'total_distance': total_distance,
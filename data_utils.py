@@ -4,10 +4,27 @@ Data utilities for Milesage - Last-Mile Optimizer
 Handles data loading, validation, normalization, and synthetic data generation.
 """
 
+import hashlib
+import math
+import numbers
+import os
+from pathlib import Path
 import pandas as pd
 import numpy as np
 from typing import Dict, Optional, Tuple
-from datetime import datetime, timedelta
+from datetime import datetime, time, timedelta
+from functools import lru_cache
+
+from _kernels import NUMBA_AVAILABLE, haversine_matrix
+
+
+# Mean Earth radius in kilometers
+EARTH_RADIUS_KM = 6371.0
+
+# On-disk distance-matrix cache (see load_or_build_distance_matrix)
+DISK_CACHE_DIR = Path(os.environ.get('MILESAGE_CACHE_DIR', Path.home() / '.milesage_cache'))
+DISK_CACHE_MIN_STOPS = 1000  # Smaller matrices build faster than they load
+DISK_CACHE_MAX_FILES = 8
 
 
 def haversine_distance(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
@@ -19,8 +36,18 @@ def haversine_distance(lat1: float, lon1: float, lat2: float, lon2: float) -> fl
         lat2, lon2: Latitude and longitude of second point in degrees
     
     Returns:
-        Distance in kilometers
+        Distance in kilometers (an array if any input is an array)
     """
+    if all(isinstance(x, numbers.Real) for x in (lat1, lon1, lat2, lon2)):
+        # Scalars: math calls libm directly, without NumPy's ufunc dispatch;
+        # lists, Series and other array-likes take the NumPy path below
+        lat1, lon1, lat2, lon2 = (math.radians(lat1), math.radians(lon1),
+                                  math.radians(lat2), math.radians(lon2))
+        sin_dlat = math.sin((lat2 - lat1) * 0.5)
+        sin_dlon = math.sin((lon2 - lon1) * 0.5)
+        a = sin_dlat * sin_dlat + math.cos(lat1) * math.cos(lat2) * sin_dlon * sin_dlon
+        return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(min(a, 1.0)))
+    
     # Convert to radians
     lat1, lon1, lat2, lon2 = map(np.radians, [lat1, lon1, lat2, lon2])
     
@@ -30,10 +57,7 @@ def haversine_distance(lat1: float, lon1: float, lat2: float, lon2: float) -> fl
     a = np.sin(dlat/2)**2 + np.cos(lat1) * np.cos(lat2) * np.sin(dlon/2)**2
     c = 2 * np.arcsin(np.sqrt(a))
     
-    # Earth radius in kilometers
-    R = 6371.0
-    
-    return R * c
+    return EARTH_RADIUS_KM * c
 
 
 def generate_synthetic_data(n_customers: int = 40, seed: int = 42) -> pd.DataFrame:
@@ -47,57 +71,97 @@ def generate_synthetic_data(n_customers: int = 40, seed: int = 42) -> pd.DataFra
     Returns:
         DataFrame with columns: stop_id, lat, lon, demand, earliest_time, latest_time, service_time
     """
-    np.random.seed(seed)
+    # One generator, every column drawn in a single vectorized call
+    rng = np.random.default_rng(seed)
     
     # Define a city-like bounding box (e.g., Boston area)
     center_lat, center_lon = 42.36, -71.06
     lat_range = 0.15  # ~17 km
     lon_range = 0.15  # ~12 km
     
-    data = []
-    
     # Generate depot
-    depot_lat = center_lat + np.random.uniform(-0.02, 0.02)
-    depot_lon = center_lon + np.random.uniform(-0.02, 0.02)
-    data.append({
+    depot = pd.DataFrame([{
         'stop_id': 'DEPOT',
-        'lat': depot_lat,
-        'lon': depot_lon,
+        'lat': center_lat + rng.uniform(-0.02, 0.02),
+        'lon': center_lon + rng.uniform(-0.02, 0.02),
         'demand': 0,
         'earliest_time': '08:00',
         'latest_time': '20:00',
         'service_time': 0
-    })
+    }])
     
     # Generate customers
-    for i in range(n_customers):
-        lat = center_lat + np.random.uniform(-lat_range, lat_range)
-        lon = center_lon + np.random.uniform(-lon_range, lon_range)
-        
-        # Random demand (packages/units)
-        demand = np.random.choice([1, 2, 3, 4, 5], p=[0.4, 0.3, 0.15, 0.1, 0.05])
-        
-        # Random time window (start between 9:00-14:00, duration 2-6 hours)
-        start_hour = np.random.randint(9, 15)
-        window_duration = np.random.choice([2, 3, 4, 5, 6], p=[0.2, 0.3, 0.3, 0.15, 0.05])
-        earliest = f"{start_hour:02d}:00"
-        latest_hour = min(20, start_hour + window_duration)
-        latest = f"{latest_hour:02d}:00"
-        
-        # Service time (5-15 minutes)
-        service_time = np.random.choice([5, 10, 15], p=[0.3, 0.5, 0.2])
-        
-        data.append({
-            'stop_id': f'CUST_{i+1:03d}',
-            'lat': lat,
-            'lon': lon,
-            'demand': demand,
-            'earliest_time': earliest,
-            'latest_time': latest,
-            'service_time': service_time
-        })
-    
-    return pd.DataFrame(data)
+    lats = center_lat + rng.uniform(-lat_range, lat_range, n_customers)
+    lons = center_lon + rng.uniform(-lon_range, lon_range, n_customers)
+    
+    # Random demand (packages/units)
+    demand = rng.choice([1, 2, 3, 4, 5], size=n_customers, p=[0.4, 0.3, 0.15, 0.1, 0.05])
+    
+    # Random time window (start between 9:00-14:00, duration 2-6 hours)
+    start_hour = rng.integers(9, 15, n_customers)
+    window_duration = rng.choice([2, 3, 4, 5, 6], size=n_customers, p=[0.2, 0.3, 0.3, 0.15, 0.05])
+    latest_hour = np.minimum(20, start_hour + window_duration)
+    
+    # Service time (5-15 minutes)
+    service_time = rng.choice([5, 10, 15], size=n_customers, p=[0.3, 0.5, 0.2])
+    
+    customers = pd.DataFrame({
+        'stop_id': [f'CUST_{i:03d}' for i in range(1, n_customers + 1)],
+        'lat': lats,
+        'lon': lons,
+        'demand': demand,
+        'earliest_time': [f"{hour:02d}:00" for hour in start_hour.tolist()],
+        'latest_time': [f"{hour:02d}:00" for hour in latest_hour.tolist()],
+        'service_time': service_time
+    })
+    
+    return pd.concat([depot, customers], ignore_index=True)
+
+
+def _haversine_matrix_numpy(lat: np.ndarray, lon: np.ndarray) -> np.ndarray:
+    """
+    Pairwise Haversine distances via NumPy broadcasting.
+    
+    Works in float32 and in place, so at most two NxN buffers are alive at
+    once (instead of half a dozen float64 temporaries) and each SIMD op
+    covers twice as many lanes. float32 keeps sub-meter accuracy, below the
+    solver's 1 m cost resolution.
+    
+    The matrix is symmetric, but unlike the Numba kernel this computes both
+    triangles: gathering and scattering a triangle through triu_indices
+    costs more than the contiguous broadcast it would save.
+    
+    Args:
+        lat, lon: 1-D arrays of coordinates in radians
+    
+    Returns:
+        NxN float32 array of distances in kilometers
+    """
+    lat = np.asarray(lat, dtype=np.float32)
+    lon = np.asarray(lon, dtype=np.float32)
+    cos_lat = np.cos(lat)
+    
+    # a = sin^2(dlat/2) + cos(lat_i) * cos(lat_j) * sin^2(dlon/2)
+    a = np.subtract.outer(lat, lat)
+    a *= 0.5
+    np.sin(a, out=a)
+    a *= a
+    
+    term = np.subtract.outer(lon, lon)
+    term *= 0.5
+    np.sin(term, out=term)
+    term *= term
+    term *= cos_lat[:, None]
+    term *= cos_lat[None, :]
+    a += term
+    del term
+    
+    # Clamp rounding overshoot for antipodal points, then d = 2R * asin(sqrt(a))
+    np.minimum(a, 1.0, out=a)
+    np.sqrt(a, out=a)
+    np.arcsin(a, out=a)
+    a *= 2 * EARTH_RADIUS_KM
+    return a
 
 
 def build_distance_matrix(df: pd.DataFrame) -> np.ndarray:
@@ -110,38 +174,113 @@ def build_distance_matrix(df: pd.DataFrame) -> np.ndarray:
     Returns:
         NxN numpy array of distances in kilometers (float32 to save memory)
     """
-    n = len(df)
+    coords = np.radians(df[['lat', 'lon']].to_numpy(dtype=np.float64))
+    
+    if NUMBA_AVAILABLE:
+        # Multi-threaded native loop, written straight into a float32 buffer
+        dist_matrix = haversine_matrix(coords[:, 0].copy(), coords[:, 1].copy(), EARTH_RADIUS_KM)
+    else:
+        # In-place float32 broadcast: NumPy's SIMD float32 trig outruns both
+        # sklearn's float64 pairwise loop and numexpr's per-element libm calls
+        dist_matrix = _haversine_matrix_numpy(coords[:, 0], coords[:, 1])
     
     # Use float32 to save memory (sufficient precision for distance calculations)
     # This reduces memory usage by 50% compared to float64
-    dist_matrix = np.zeros((n, n), dtype=np.float32)
-    
-    # Build distance matrix
-    for i in range(n):
-        for j in range(n):
-            if i != j:
-                dist_matrix[i, j] = haversine_distance(
-                    df.iloc[i]['lat'], df.iloc[i]['lon'],
-                    df.iloc[j]['lat'], df.iloc[j]['lon']
-                )
+    dist_matrix = dist_matrix.astype(np.float32, copy=False)
     
     return dist_matrix
 
 
-def build_time_matrix(distance_matrix: np.ndarray, speed_kmh: float) -> np.ndarray:
+def load_or_build_distance_matrix(
+    df: pd.DataFrame,
+    cache_dir: Optional[Path] = None
+) -> np.ndarray:
+    """
+    Distance matrix backed by an on-disk .npy cache that survives restarts.
+    
+    The cache key is a digest of the coordinates (rounded to ~0.1 m), so the
+    same stop set hits the cache whatever file or session it came from.
+    Hits are memory-mapped read-only, so only the pages the solver touches
+    are read, and have their mtime refreshed so that eviction drops the
+    least recently used of the DISK_CACHE_MAX_FILES matrices. Stop sets
+    below DISK_CACHE_MIN_STOPS, and any disk error, fall back to
+    build_distance_matrix.
+    
+    Args:
+        df: DataFrame with 'lat' and 'lon' columns
+        cache_dir: Cache directory (default: DISK_CACHE_DIR, or $MILESAGE_CACHE_DIR)
+    
+    Returns:
+        NxN float32 array of distances in kilometers
+    """
+    if len(df) < DISK_CACHE_MIN_STOPS:
+        return build_distance_matrix(df)
+    
+    coords = np.round(df[['lat', 'lon']].to_numpy(dtype=np.float64), 6)
+    key = hashlib.blake2b(coords.tobytes(), digest_size=16).hexdigest()
+    cache_dir = Path(cache_dir) if cache_dir is not None else DISK_CACHE_DIR
+    path = cache_dir / f"{key}_dist.npy"
+    
+    if path.exists():
+        try:
+            matrix = np.load(path, mmap_mode='r')
+            if matrix.shape == (len(df), len(df)):
+                try:
+                    os.utime(path)  # Mark as recently used for eviction
+                except OSError:
+                    pass  # Read-only cache directory
+                return matrix
+        except (OSError, ValueError):
+            pass  # Truncated or foreign file: rebuild and overwrite
+    
+    matrix = build_distance_matrix(df)
+    try:
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        # Write then rename, so a concurrent reader never sees a partial file
+        tmp_path = cache_dir / f"{key}_dist.{os.getpid()}.tmp"
+        try:
+            with open(tmp_path, 'wb') as f:
+                np.save(f, matrix)
+            os.replace(tmp_path, path)
+        finally:
+            # Already renamed on success; a failed write must not leave it behind
+            tmp_path.unlink(missing_ok=True)
+        
+        # Keep only the most recently used matrices (hits refresh the mtime)
+        cached = sorted(cache_dir.glob('*_dist.npy'), key=lambda p: p.stat().st_mtime, reverse=True)
+        for old in cached[DISK_CACHE_MAX_FILES:]:
+            try:
+                old.unlink()
+            except OSError:
+                continue  # E.g. still memory-mapped on Windows; evicted on a later write
+    except OSError:
+        pass  # Read-only or full disk: the cache is best-effort
+    
+    return matrix
+
+
+def build_time_matrix(
+    distance_matrix: np.ndarray,
+    speed_kmh: float,
+    out: Optional[np.ndarray] = None
+) -> np.ndarray:
     """
     Convert distance matrix to time matrix.
     
     Args:
         distance_matrix: NxN distance matrix in kilometers
         speed_kmh: Average vehicle speed in km/h
+        out: Optional preallocated NxN float32 buffer to write into, e.g. the
+            previous time matrix when only the speed changed
     
     Returns:
-        NxN numpy array of travel times in minutes
+        NxN numpy array of travel times in minutes (float32, like the distance matrix)
     """
-    # Time in hours, then convert to minutes
-    time_matrix = (distance_matrix / speed_kmh) * 60
-    return time_matrix
+    # Time in hours, then convert to minutes. Fold the conversion into one
+    # float32 factor so a NumPy float64 speed cannot upcast the result, and
+    # scale in a single pass with no intermediate matrix.
+    minutes_per_km = np.float32(60.0 / float(speed_kmh))
+    return np.multiply(distance_matrix, minutes_per_km, out=out, dtype=np.float32)
 
 
 def parse_time_window(time_str: str) -> Optional[int]:
@@ -149,26 +288,66 @@ def parse_time_window(time_str: str) -> Optional[int]:
     Parse time string (HH:MM format) to minutes from midnight.
     
     Args:
-        time_str: Time string in HH:MM format
+        time_str: Time string in HH:MM format, or a datetime.time (the pyarrow
+                  CSV engine and Excel time cells produce these)
     
     Returns:
         Minutes from midnight, or None if parsing fails
     """
-    if pd.isna(time_str) or time_str is None or time_str == '':
+    if isinstance(time_str, str):
+        # Checked first: time columns repeat a handful of strings, so this is
+        # usually a single cache lookup
+        return _parse_hhmm(time_str)
+    
+    if pd.isna(time_str) or time_str is None:
         return None
     
-    try:
-        if isinstance(time_str, str):
-            parts = time_str.split(':')
-            if len(parts) == 2:
-                hours = int(parts[0])
-                minutes = int(parts[1])
-                return hours * 60 + minutes
+    if isinstance(time_str, time):
+        return time_str.hour * 60 + time_str.minute
+    return None
+
+
+@lru_cache(maxsize=256)
+def _parse_hhmm(time_str: str) -> Optional[int]:
+    """Parse an "HH:MM" string to minutes from midnight (None if malformed)."""
+    parts = time_str.split(':')
+    if len(parts) != 2:
         return None
-    except:
+    try:
+        return int(parts[0]) * 60 + int(parts[1])
+    except ValueError:
         return None
 
 
+def _parse_time_column(values: pd.Series) -> pd.Series:
+    """
+    Parse a column of HH:MM strings to minutes from midnight.
+    
+    Time-window columns hold few distinct values, so each distinct value is
+    parsed once with parse_time_window and the results are broadcast back
+    through the factorized codes, instead of one Python call per row.
+    
+    Args:
+        values: Column of HH:MM strings
+    
+    Returns:
+        Minutes from midnight, with the same dtype as values.apply(parse_time_window):
+        int64 if every value parses, object Nones if none do, float64 with NaN otherwise
+    """
+    codes, uniques = pd.factorize(values)
+    parsed = pd.Series(uniques, dtype=object).map(parse_time_window).astype(np.float64).to_numpy()
+    minutes = np.full(len(codes), np.nan)
+    present = codes >= 0
+    minutes[present] = parsed[codes[present]]
+    
+    missing = np.isnan(minutes)
+    if missing.all():
+        return pd.Series([None] * len(values), index=values.index, dtype=object)
+    if not missing.any():
+        return pd.Series(minutes.astype(np.int64), index=values.index)
+    return pd.Series(minutes, index=values.index)
+
+
 def normalize_dataframe(
     df: pd.DataFrame,
     column_mapping: Dict[str, str],
@@ -187,29 +366,30 @@ def normalize_dataframe(
     Returns:
         Tuple of (normalized DataFrame, error message if any)
     """
-    normalized = pd.DataFrame()
-    
-    # Map required columns
+    # Check every required mapping before converting any column
     if 'stop_id' not in column_mapping or column_mapping['stop_id'] is None:
         return None, "Stop ID column mapping is required"
-    
-    normalized['stop_id'] = df[column_mapping['stop_id']].astype(str)
-    
-    # Map latitude
     if 'lat' not in column_mapping or column_mapping['lat'] is None:
         return None, "Latitude column mapping is required"
-    normalized['lat'] = pd.to_numeric(df[column_mapping['lat']], errors='coerce')
-    
-    # Map longitude
     if 'lon' not in column_mapping or column_mapping['lon'] is None:
         return None, "Longitude column mapping is required"
-    normalized['lon'] = pd.to_numeric(df[column_mapping['lon']], errors='coerce')
     
-    # Check for invalid lat/lon
-    if normalized['lat'].isna().any() or normalized['lon'].isna().any():
-        return None, "Invalid latitude or longitude values found"
+    normalized = pd.DataFrame()
+    
+    # Map required columns
+    normalized['stop_id'] = df[column_mapping['stop_id']].astype(str)
+    normalized['lat'] = pd.to_numeric(df[column_mapping['lat']], errors='coerce')
+    normalized['lon'] = pd.to_numeric(df[column_mapping['lon']], errors='coerce')
     
-    if (normalized['lat'].abs() > 90).any() or (normalized['lon'].abs() > 180).any():
+    # Check for invalid lat/lon in one pass per column: NaN fails the bounds
+    # comparison too, so the masks are only inspected further on failure
+    lat = normalized['lat'].to_numpy(dtype=np.float64, na_value=np.nan)
+    lon = normalized['lon'].to_numpy(dtype=np.float64, na_value=np.nan)
+    lat_ok = np.abs(lat) <= 90
+    lon_ok = np.abs(lon) <= 180
+    if not (lat_ok.all() and lon_ok.all()):
+        if np.isnan(lat).any() or np.isnan(lon).any():
+            return None, "Invalid latitude or longitude values found"
         return None, "Latitude must be between -90 and 90, longitude between -180 and 180"
     
     # Map is_depot
@@ -218,11 +398,14 @@ def normalize_dataframe(
     else:
         # Use explicit depot_stop_id
         if depot_stop_id:
-            normalized['is_depot'] = (normalized['stop_id'] == str(depot_stop_id))
+            normalized['is_depot'] = normalized['stop_id'].to_numpy() == str(depot_stop_id)
         else:
-            # Default: assume first row is depot
-            normalized['is_depot'] = False
-            normalized.loc[0, 'is_depot'] = True
+            # Default: assume first row is depot. Set by position on a plain
+            # array: a label lookup for 0 would append a row if the input's
+            # index does not start at 0
+            is_depot = np.zeros(len(normalized), dtype=bool)
+            is_depot[:1] = True
+            normalized['is_depot'] = is_depot
     
     # Check that at least one depot exists
     if not normalized['is_depot'].any():
@@ -241,13 +424,13 @@ def normalize_dataframe(
     
     if 'earliest_time' in column_mapping and column_mapping['earliest_time']:
         time_col = df[column_mapping['earliest_time']]
-        normalized['earliest_time'] = time_col.apply(parse_time_window)
+        normalized['earliest_time'] = _parse_time_column(time_col)
     else:
         normalized['earliest_time'] = None
     
     if 'latest_time' in column_mapping and column_mapping['latest_time']:
         time_col = df[column_mapping['latest_time']]
-        normalized['latest_time'] = time_col.apply(parse_time_window)
+        normalized['latest_time'] = _parse_time_column(time_col)
     else:
         normalized['latest_time'] = None
     
@@ -256,6 +439,14 @@ def normalize_dataframe(
     else:
         normalized['service_time'] = 0
     
+    # Compact dtypes once here so every downstream mask, sum and lookup works
+    # on narrow columns. float32 holds integer demands/minutes exactly up to 2^24.
+    normalized = normalized.astype({
+        'is_depot': bool,
+        'demand': np.float32,
+        'service_time': np.float32,
+    })
+    
     # Reset index and ensure stop_id is unique
     normalized = normalized.reset_index(drop=True)
     
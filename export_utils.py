@@ -2,6 +2,8 @@
 Export utilities for routes and reports.
 """
 
+import io
+import numpy as np
 import pandas as pd
 import streamlit as st
 from typing import Dict, Optional
@@ -24,29 +26,61 @@ def export_routes_to_csv(solution: Dict, df: pd.DataFrame, scenario_name: str =
     Returns:
         DataFrame with route details
     """
-    route_rows = []
+    # Gather stop attributes from plain arrays, one positional take per
+    # route instead of a row Series per stop
+    n_stops = len(df)
+    stop_columns = {
+        'stop_id': ('stop_id', ''),
+        'latitude': ('lat', 0),
+        'longitude': ('lon', 0),
+        'is_depot': ('is_depot', False),
+        'demand': ('demand', 0),
+    }
+    stop_arrays = {
+        name: df[col].to_numpy() if col in df.columns else np.full(n_stops, default, dtype=object)
+        for name, (col, default) in stop_columns.items()
+    }
     
+    columns = {name: [] for name in ('scenario_name', 'vehicle_id', 'stop_sequence', *stop_columns,
+                                     'route_distance_km', 'route_duration_minutes')}
     for route_detail in solution.get('route_details', []):
-        vehicle_id = route_detail.get('vehicle_id', 'Unknown')
-        stops = route_detail.get('stops', [])
+        stops = np.asarray(route_detail.get('stops', []), dtype=np.intp)
+        sequence = np.flatnonzero(stops < n_stops)
+        idx = stops[sequence]
         
-        for seq_idx, stop_idx in enumerate(stops):
-            if stop_idx < len(df):
-                stop_row = df.iloc[stop_idx]
-                route_rows.append({
-                    'scenario_name': scenario_name,
-                    'vehicle_id': vehicle_id,
-                    'stop_sequence': seq_idx,
-                    'stop_id': stop_row.get('stop_id', ''),
-                    'latitude': stop_row.get('lat', 0),
-                    'longitude': stop_row.get('lon', 0),
-                    'is_depot': stop_row.get('is_depot', False),
-                    'demand': stop_row.get('demand', 0),
-                    'route_distance_km': route_detail.get('distance', 0),
-                    'route_duration_minutes': route_detail.get('time', 0),
-                })
-    
-    return pd.DataFrame(route_rows)
+        columns['scenario_name'].append(np.full(len(idx), scenario_name, dtype=object))
+        columns['vehicle_id'].append(np.full(len(idx), route_detail.get('vehicle_id', 'Unknown'), dtype=object))
+        columns['stop_sequence'].append(sequence)
+        for name, values in stop_arrays.items():
+            columns[name].append(values[idx])
+        columns['route_distance_km'].append(np.full(len(idx), route_detail.get('distance', 0)))
+        columns['route_duration_minutes'].append(np.full(len(idx), route_detail.get('time', 0)))
+    
+    return pd.DataFrame(
+        {name: np.concatenate(parts) for name, parts in columns.items()}
+        if columns['stop_sequence'] else {}
+    )
+
+
+def _csv_bytes(df: pd.DataFrame) -> bytes:
+    """
+    Encode a DataFrame as UTF-8 CSV bytes for st.download_button.
+    
+    Written straight into a byte buffer, so no intermediate str is built and
+    re-encoded. Coordinates are written with 6 fixed decimals (~0.1 m) and
+    other floats with 8 significant digits, instead of their full 17-digit
+    repr.
+    """
+    # %.8g alone would leave |lon| >= 100 with only 5 decimals
+    coordinate_columns = [name for name in ('latitude', 'longitude') if name in df.columns]
+    if coordinate_columns:
+        df = df.assign(**{
+            name: np.char.mod('%.6f', df[name].to_numpy(dtype=np.float64))
+            for name in coordinate_columns
+        })
+    buffer = io.BytesIO()
+    df.to_csv(buffer, index=False, encoding='utf-8', float_format='%.8g')
+    return buffer.getvalue()
 
 
 def generate_pdf_report(
@@ -101,16 +135,16 @@ def generate_pdf_report(
     pdf.cell(0, 10, "Route Details", ln=1)
     pdf.set_font("Arial", "", 9)
     
-    for route_detail in route_details[:10]:  # Limit to first 10 routes to avoid overflow
-        vehicle_id = route_detail.get('vehicle_id', 'Unknown')
-        n_stops = route_detail.get('n_stops', 0)
-        distance = route_detail.get('distance', 0)
-        time = route_detail.get('time', 0)
-        
-        pdf.cell(0, 7, f"Vehicle {vehicle_id}: {n_stops} stops, {distance:.2f} km, {time/60:.2f} hrs", ln=1)
-    
+    # One line per route, laid out in a single multi_cell call
+    route_lines = [
+        f"Vehicle {route_detail.get('vehicle_id', 'Unknown')}: {route_detail.get('n_stops', 0)} stops, "
+        f"{route_detail.get('distance', 0):.2f} km, {route_detail.get('time', 0) / 60:.2f} hrs"
+        for route_detail in route_details[:10]  # Limit to first 10 routes to avoid overflow
+    ]
     if len(route_details) > 10:
-        pdf.cell(0, 7, f"... and {len(route_details) - 10} more routes", ln=1)
+        route_lines.append(f"... and {len(route_details) - 10} more routes")
+    if route_lines:
+        pdf.multi_cell(0, 7, "\n".join(route_lines))
     
     pdf.ln(5)
     
@@ -141,90 +175,86 @@ def render_export_ui(solution: Dict, df: pd.DataFrame, config: Dict, scenario_na
         config: Configuration dictionary
         scenario_name: Name of the scenario
     """
-    st.markdown('<div class="milesage-card">', unsafe_allow_html=True)
-    st.markdown("### 📥 Export Options")
-    
-    col1, col2 = st.columns(2)
-    
-    with col1:
-        # CSV Export
-        if solution and 'route_details' in solution:
-            routes_df = export_routes_to_csv(solution, df, scenario_name)
-            
-            csv = routes_df.to_csv(index=False)
-            st.download_button(
-                label="📊 Download All Routes as CSV",
-                data=csv,
-                file_name=f"milesage_routes_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
-                mime="text/csv",
-                use_container_width=True
-            )
-            
-            # Single vehicle export
-            vehicle_ids = [rd.get('vehicle_id') for rd in solution.get('route_details', [])]
-            if vehicle_ids:
-                selected_vehicle = st.selectbox(
-                    "Select vehicle for detailed export",
-                    options=["All vehicles"] + vehicle_ids,
-                    key="export_vehicle_select"
+    with st.container(border=True):
+        st.markdown("### 📥 Export Options")
+        
+        col1, col2 = st.columns(2)
+        
+        with col1:
+            # CSV Export
+            if solution and 'route_details' in solution:
+                routes_df = export_routes_to_csv(solution, df, scenario_name)
+                
+                st.download_button(
+                    label="📊 Download All Routes as CSV",
+                    data=_csv_bytes(routes_df),
+                    file_name=f"milesage_routes_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
+                    mime="text/csv",
+                    use_container_width=True
                 )
                 
-                if selected_vehicle and selected_vehicle != "All vehicles":
-                    vehicle_routes_df = routes_df[routes_df['vehicle_id'] == selected_vehicle]
-                    csv_single = vehicle_routes_df.to_csv(index=False)
-                    st.download_button(
-                        label=f"📋 Download {selected_vehicle} Manifest",
-                        data=csv_single,
-                        file_name=f"milesage_vehicle_{selected_vehicle}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
-                        mime="text/csv",
-                        use_container_width=True
+                # Single vehicle export
+                vehicle_ids = [rd.get('vehicle_id') for rd in solution.get('route_details', [])]
+                if vehicle_ids:
+                    selected_vehicle = st.selectbox(
+                        "Select vehicle for detailed export",
+                        options=["All vehicles"] + vehicle_ids,
+                        key="export_vehicle_select"
                     )
-    
-    with col2:
-        # PDF Export
-        if solution and 'route_details' in solution:
-            # Calculate KPIs for PDF
-            kpis = {
-                'opt_distance': solution.get('total_distance', 0),
-                'opt_time': solution.get('total_time', 0),
-                'opt_vehicles': solution.get('n_vehicles_used', 0),
-                'opt_cost': 0,
-            }
-            
-            # Calculate cost
-            cost_per_km = config.get('cost_per_km', 1.5)
-            fixed_cost = config.get('fixed_cost_per_vehicle', 50.0)
-            cost_per_hour = config.get('cost_per_hour', 25.0)
-            kpis['opt_cost'] = (
-                kpis['opt_distance'] * cost_per_km +
-                kpis['opt_vehicles'] * fixed_cost +
-                (kpis['opt_time'] / 60) * cost_per_hour
-            )
-            
-            # Get route details
-            route_details = solution.get('route_details', [])
-            
-            # Build config dict for PDF
-            pdf_config = {
-                'model_params': {
-                    'n_vehicles': config.get('n_vehicles', 5),
-                    'vehicle_capacity': config.get('vehicle_capacity'),
-                    'max_route_duration_hours': config.get('max_route_duration_hours', 8.0),
+                    
+                    if selected_vehicle and selected_vehicle != "All vehicles":
+                        vehicle_routes_df = routes_df[routes_df['vehicle_id'] == selected_vehicle]
+                        st.download_button(
+                            label=f"📋 Download {selected_vehicle} Manifest",
+                            data=_csv_bytes(vehicle_routes_df),
+                            file_name=f"milesage_vehicle_{selected_vehicle}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
+                            mime="text/csv",
+                            use_container_width=True
+                        )
+        
+        with col2:
+            # PDF Export
+            if solution and 'route_details' in solution:
+                # Calculate KPIs for PDF
+                kpis = {
+                    'opt_distance': solution.get('total_distance', 0),
+                    'opt_time': solution.get('total_time', 0),
+                    'opt_vehicles': solution.get('n_vehicles_used', 0),
+                    'opt_cost': 0,
                 }
-            }
-            
-            try:
-                pdf_bytes = generate_pdf_report(scenario_name, kpis, route_details, pdf_config)
-                st.download_button(
-                    label="📄 Download PDF Report",
-                    data=pdf_bytes,
-                    file_name=f"milesage_report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf",
-                    mime="application/pdf",
-                    use_container_width=True
+                
+                # Calculate cost
+                cost_per_km = config.get('cost_per_km', 1.5)
+                fixed_cost = config.get('fixed_cost_per_vehicle', 50.0)
+                cost_per_hour = config.get('cost_per_hour', 25.0)
+                kpis['opt_cost'] = (
+                    kpis['opt_distance'] * cost_per_km +
+                    kpis['opt_vehicles'] * fixed_cost +
+                    (kpis['opt_time'] / 60) * cost_per_hour
                 )
-            except Exception as e:
-                st.warning(f"PDF generation may not work: {e}")
-                st.info("💡 Make sure fpdf2 is installed: pip install fpdf2")
-    
-    st.markdown('</div>', unsafe_allow_html=True)
+                
+                # Get route details
+                route_details = solution.get('route_details', [])
+                
+                # Build config dict for PDF
+                pdf_config = {
+                    'model_params': {
+                        'n_vehicles': config.get('n_vehicles', 5),
+                        'vehicle_capacity': config.get('vehicle_capacity'),
+                        'max_route_duration_hours': config.get('max_route_duration_hours', 8.0),
+                    }
+                }
+                
+                try:
+                    pdf_bytes = generate_pdf_report(scenario_name, kpis, route_details, pdf_config)
+                    st.download_button(
+                        label="📄 Download PDF Report",
+                        data=pdf_bytes,
+                        file_name=f"milesage_report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf",
+                        mime="application/pdf",
+                        use_container_width=True
+                    )
+                except Exception as e:
+                    st.warning(f"PDF generation may not work: {e}")
+                    st.info("💡 Make sure fpdf2 is installed: pip install fpdf2")
 
@@ -5,6 +5,7 @@ Scenario Manager - Save, load, and compare optimization scenarios.
 import streamlit as st
 from typing import Dict, Optional, List
 from datetime import datetime
+import numpy as np
 import pandas as pd
 
 
@@ -77,17 +78,21 @@ def save_scenario(name: str, notes: str = "") -> bool:
     kpis['opt_cost'] = opt_cost
     kpis['cost_improvement_pct'] = ((naive_cost - opt_cost) / naive_cost * 100) if naive_cost > 0 else 0
     
-    # Extract routes
-    routes = []
-    for route_detail in opt_sol.get('route_details', []):
-        routes.append({
-            'vehicle_id': route_detail.get('vehicle_id'),
-            'n_stops': route_detail.get('n_stops', 0),
-            'distance': route_detail.get('distance', 0),
-            'time': route_detail.get('time', 0),
-            'demand': route_detail.get('demand', 0),
-            'stops': route_detail.get('stops', [])
-        })
+    # Extract routes column-wise: one array per field, so per-route metrics
+    # can be summed or compared without a Python loop over routes
+    route_details = opt_sol.get('route_details', [])
+    routes = {
+        'vehicle_id': np.array([r.get('vehicle_id') for r in route_details]),
+        'n_stops': np.array([r.get('n_stops', 0) for r in route_details], dtype=np.int32),
+        'distance': np.array([r.get('distance', 0) for r in route_details], dtype=np.float64),
+        'time': np.array([r.get('time', 0) for r in route_details], dtype=np.float64),
+        'demand': np.array([r.get('demand', 0) for r in route_details], dtype=np.float64),
+    }
+    # All stop sequences in one flat int32 array; route i's stops are
+    # stops[stop_offsets[i]:stop_offsets[i + 1]]
+    stops = [np.asarray(r.get('stops', []), dtype=np.int32) for r in route_details]
+    routes['stop_offsets'] = np.concatenate(([0], np.cumsum([len(route_stops) for route_stops in stops]))).astype(np.int64)
+    routes['stops'] = np.concatenate(stops) if stops else np.empty(0, dtype=np.int32)
     
     # Dataset label
     dataset_label = "Synthetic Dataset"
@@ -190,30 +195,32 @@ def compare_scenarios(scenario_names: List[str]) -> pd.DataFrame:
     if 'scenarios' not in st.session_state:
         return pd.DataFrame()
     
-    comparison_data = []
+    names = [name for name in scenario_names if name in st.session_state.scenarios]
+    scenarios = [st.session_state.scenarios[name] for name in names]
+    kpis = [scenario.get('kpis', {}) for scenario in scenarios]
     
-    for name in scenario_names:
-        if name not in st.session_state.scenarios:
-            continue
-        
-        scenario = st.session_state.scenarios[name]
-        kpis = scenario.get('kpis', {})
-        model_params = scenario.get('model_params', {})
-        
-        comparison_data.append({
-            'Scenario': name,
-            'Dataset': scenario.get('dataset_label', 'N/A'),
-            'Mode': scenario.get('config_mode', 'N/A'),
-            'Vehicles Used': kpis.get('opt_vehicles', 0),
-            'Total Distance (km)': f"{kpis.get('opt_distance', 0):.2f}",
-            'Total Time (hrs)': f"{kpis.get('opt_time', 0) / 60:.2f}",
-            'Total Cost ($)': f"{kpis.get('opt_cost', 0):.2f}",
-            'Distance Improvement (%)': f"{kpis.get('distance_improvement_pct', 0):.1f}",
-            'Cost Improvement (%)': f"{kpis.get('cost_improvement_pct', 0):.1f}",
-            'Max Vehicles': model_params.get('n_vehicles', 0),
-        })
+    # Gather raw values column by column, then format each column in one pass
+    comparison = pd.DataFrame({
+        'Scenario': names,
+        'Dataset': [scenario.get('dataset_label', 'N/A') for scenario in scenarios],
+        'Mode': [scenario.get('config_mode', 'N/A') for scenario in scenarios],
+        'Vehicles Used': [k.get('opt_vehicles', 0) for k in kpis],
+        'Total Distance (km)': pd.Series([k.get('opt_distance', 0) for k in kpis], dtype=np.float64),
+        'Total Time (hrs)': pd.Series([k.get('opt_time', 0) for k in kpis], dtype=np.float64) / 60,
+        'Total Cost ($)': pd.Series([k.get('opt_cost', 0) for k in kpis], dtype=np.float64),
+        'Distance Improvement (%)': pd.Series([k.get('distance_improvement_pct', 0) for k in kpis], dtype=np.float64),
+        'Cost Improvement (%)': pd.Series([k.get('cost_improvement_pct', 0) for k in kpis], dtype=np.float64),
+        'Max Vehicles': [scenario.get('model_params', {}).get('n_vehicles', 0) for scenario in scenarios],
+    })
+    if comparison.empty:
+        return pd.DataFrame()
+    
+    for column in ('Total Distance (km)', 'Total Time (hrs)', 'Total Cost ($)'):
+        comparison[column] = comparison[column].map('{:.2f}'.format)
+    for column in ('Distance Improvement (%)', 'Cost Improvement (%)'):
+        comparison[column] = comparison[column].map('{:.1f}'.format)
     
-    return pd.DataFrame(comparison_data)
+    return comparison
 
 
 def render_scenario_manager_ui():
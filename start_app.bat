@@ -1,5 +1,7 @@
 @echo off
 cd /d "C:\Users\user\OneDrive - Suffolk University\Documents\Courses\ISOM 839 Prescriptive Analytics Modeling and Optimization\Milesage"
+rem Warm the Numba kernel cache when numba is installed
+python -c "import numba" >nul 2>&1 && python _kernels.py
 python -m streamlit run app.py --server.port 8506
 pause
 
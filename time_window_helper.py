@@ -2,12 +2,32 @@
 Time Window Helper - Generate time windows from timestamps and SLA.
 """
 
+import numpy as np
 import pandas as pd
 from datetime import datetime, timedelta
 from typing import Optional, Tuple
 import streamlit as st
 
 
+# "HH:MM" for every minute of the day, indexed by hour * 60 + minute. Used as
+# the categories of generated time-window columns, shared across calls.
+_HHMM_LUT = np.array([f"{hour:02d}:{minute:02d}" for hour in range(24) for minute in range(60)], dtype=object)
+_HHMM_DTYPE = pd.CategoricalDtype(categories=_HHMM_LUT, ordered=True)
+
+# Common timestamp layouts probed against the first value of a text column;
+# a match is passed to to_datetime explicitly instead of being inferred
+_TIMESTAMP_FORMATS = (
+    '%Y-%m-%d %H:%M:%S',
+    '%Y-%m-%dT%H:%M:%S',
+    '%m/%d/%Y %H:%M',  # Month first, as pandas' own inference prefers
+    '%d/%m/%Y %H:%M',
+)
+
+# format='mixed' (parse each value on its own) exists from pandas 2.0; older
+# versions infer one format per call, which the first few values share anyway
+_MIXED_FORMAT = {'format': 'mixed'} if int(pd.__version__.split('.')[0]) >= 2 else {}
+
+
 def generate_time_windows_from_timestamp(
     df: pd.DataFrame,
     timestamp_column: str,
@@ -27,11 +47,9 @@ def generate_time_windows_from_timestamp(
     Returns:
         Tuple of (DataFrame with new columns, earliest_time column name, latest_time column name)
     """
-    df_result = df.copy()
-    
     # Parse timestamp column
     try:
-        timestamps = pd.to_datetime(df_result[timestamp_column])
+        timestamps = _parse_timestamps(df[timestamp_column])
     except Exception as e:
         raise ValueError(f"Could not parse timestamp column '{timestamp_column}': {e}")
     
@@ -46,19 +64,55 @@ def generate_time_windows_from_timestamp(
         latest_times = timestamps + half_sla
     
     # Convert to HH:MM format (time of day)
-    earliest_str = earliest_times.dt.strftime('%H:%M')
-    latest_str = latest_times.dt.strftime('%H:%M')
+    earliest_str = _format_hhmm(earliest_times)
+    latest_str = _format_hhmm(latest_times)
     
     # Add new columns
     earliest_col_name = f"auto_earliest_time"
     latest_col_name = f"auto_latest_time"
     
-    df_result[earliest_col_name] = earliest_str
-    df_result[latest_col_name] = latest_str
+    # assign returns a new frame without deep-copying the existing columns
+    df_result = df.assign(**{earliest_col_name: earliest_str, latest_col_name: latest_str})
     
     return df_result, earliest_col_name, latest_col_name
 
 
+def _parse_timestamps(values: pd.Series) -> pd.Series:
+    """
+    Parse a timestamp column, using a known format when one fits.
+    
+    The first non-null text value is probed against _TIMESTAMP_FORMATS; on a
+    match the whole column is parsed with that explicit format and a cache of
+    repeated strings. Columns that are already datetimes, match no known
+    format, or have rows in another layout take pandas' inference path.
+    """
+    first_valid = values.first_valid_index()
+    sample = values.loc[first_valid] if first_valid is not None else None
+    if isinstance(sample, str):
+        for fmt in _TIMESTAMP_FORMATS:
+            try:
+                datetime.strptime(sample.strip(), fmt)
+            except ValueError:
+                continue
+            try:
+                return pd.to_datetime(values, format=fmt, cache=True)
+            except ValueError:
+                break  # Mixed layouts; let inference report or handle them
+    return pd.to_datetime(values)
+
+
+def _format_hhmm(times: pd.Series) -> pd.Series:
+    """
+    Format datetimes as an ordered "HH:MM" Categorical (NaT -> NaN).
+    
+    The minute of the day is the category code itself, so no strings are
+    built per row and every result shares the _HHMM_DTYPE dictionary.
+    """
+    minute_of_day = (times.dt.hour * 60 + times.dt.minute).to_numpy(dtype=np.float64)
+    codes = np.where(np.isnan(minute_of_day), -1, minute_of_day).astype(np.int16)
+    return pd.Series(pd.Categorical.from_codes(codes, dtype=_HHMM_DTYPE), index=times.index)
+
+
 def compute_on_time_metrics(
     df: pd.DataFrame,
     solution: dict,
@@ -97,6 +151,37 @@ def compute_on_time_metrics(
     }
 
 
+def _datetime_columns(df: pd.DataFrame) -> list:
+    """
+    Columns usable as a base timestamp, in DataFrame order.
+    
+    Datetime-typed columns qualify by dtype alone. Text columns qualify if
+    their first few non-null values all parse as datetimes, tested with one
+    vectorized to_datetime call per column. Memoized in session state
+    against the DataFrame object, so widget reruns skip the scan.
+    """
+    memo = st.session_state.get('datetime_columns_memo')
+    if memo is None or memo[0] is not df:
+        datetime_columns = []
+        for col in df.columns:
+            values = df[col]
+            if pd.api.types.is_datetime64_any_dtype(values):
+                datetime_columns.append(col)
+            elif pd.api.types.is_object_dtype(values) or pd.api.types.is_string_dtype(values):
+                sample = values.iloc[np.flatnonzero(values.notna().to_numpy())[:3]]
+                if sample.empty:
+                    continue
+                try:
+                    parsed = pd.to_datetime(sample, errors='coerce', **_MIXED_FORMAT)
+                except (TypeError, ValueError):
+                    continue  # Non-scalar cells, e.g. lists
+                if parsed.notna().all():
+                    datetime_columns.append(col)
+        memo = (df, datetime_columns)
+        st.session_state.datetime_columns_memo = memo
+    return memo[1]
+
+
 def render_time_window_helper_ui(df: pd.DataFrame) -> Tuple[Optional[pd.DataFrame], Optional[str], Optional[str]]:
     """
     Render UI for time window helper.
@@ -110,75 +195,63 @@ def render_time_window_helper_ui(df: pd.DataFrame) -> Tuple[Optional[pd.DataFram
     if df is None or df.empty:
         return None, None, None
     
-    st.markdown('<div class="milesage-card">', unsafe_allow_html=True)
-    st.markdown("### ⏰ Time Window Helper")
-    st.markdown("Generate time windows from a timestamp column and delivery SLA.")
-    
-    # Find datetime-like columns
-    datetime_columns = []
-    for col in df.columns:
-        try:
-            sample = df[col].dropna().iloc[0] if len(df[col].dropna()) > 0 else None
-            if sample is not None:
-                pd.to_datetime(sample)
-                datetime_columns.append(col)
-        except:
-            pass
-    
-    if not datetime_columns:
-        st.info("ℹ️ No datetime columns found in the dataset. Upload data with timestamp columns to use this feature.")
-        st.markdown('</div>', unsafe_allow_html=True)
-        return None, None, None
-    
-    col1, col2 = st.columns(2)
-    
-    with col1:
-        timestamp_col = st.selectbox(
-            "Base Timestamp Column",
-            options=[None] + datetime_columns,
-            help="Select the column containing delivery timestamps"
-        )
-    
-    with col2:
-        sla_hours = st.number_input(
-            "Delivery SLA Window (hours)",
-            min_value=0.5,
-            max_value=24.0,
-            value=2.0,
-            step=0.5,
-            help="Time window duration in hours"
+    with st.container(border=True):
+        st.markdown("### ⏰ Time Window Helper")
+        st.markdown("Generate time windows from a timestamp column and delivery SLA.")
+        
+        # Find datetime-like columns
+        datetime_columns = _datetime_columns(df)
+        
+        if not datetime_columns:
+            st.info("ℹ️ No datetime columns found in the dataset. Upload data with timestamp columns to use this feature.")
+            return None, None, None
+        
+        col1, col2 = st.columns(2)
+        
+        with col1:
+            timestamp_col = st.selectbox(
+                "Base Timestamp Column",
+                options=[None] + datetime_columns,
+                help="Select the column containing delivery timestamps"
+            )
+        
+        with col2:
+            sla_hours = st.number_input(
+                "Delivery SLA Window (hours)",
+                min_value=0.5,
+                max_value=24.0,
+                value=2.0,
+                step=0.5,
+                help="Time window duration in hours"
+            )
+        
+        window_type = st.radio(
+            "Window Type",
+            options=["forward", "centered"],
+            format_func=lambda x: "Start at timestamp, end at timestamp + SLA" if x == "forward" else "Center window around timestamp (± SLA/2)",
+            help="How to position the time window relative to the timestamp"
         )
-    
-    window_type = st.radio(
-        "Window Type",
-        options=["forward", "centered"],
-        format_func=lambda x: "Start at timestamp, end at timestamp + SLA" if x == "forward" else "Center window around timestamp (± SLA/2)",
-        help="How to position the time window relative to the timestamp"
-    )
-    
-    if st.button("🔄 Generate Time Windows", use_container_width=True):
-        if timestamp_col:
-            try:
-                df_updated, earliest_col, latest_col = generate_time_windows_from_timestamp(
-                    df, timestamp_col, sla_hours, window_type
-                )
-                
-                st.success(f"✅ Time windows generated! New columns: `{earliest_col}`, `{latest_col}`")
-                st.info(f"💡 You can now map these columns in the Column Mapping section above.")
-                
-                # Auto-update column mapping if not already set
-                if 'earliest_time' not in st.session_state.column_mapping or not st.session_state.column_mapping.get('earliest_time'):
-                    st.session_state.column_mapping['earliest_time'] = earliest_col
-                if 'latest_time' not in st.session_state.column_mapping or not st.session_state.column_mapping.get('latest_time'):
-                    st.session_state.column_mapping['latest_time'] = latest_col
-                
-                st.markdown('</div>', unsafe_allow_html=True)
-                return df_updated, earliest_col, latest_col
-            except Exception as e:
-                st.error(f"❌ Error generating time windows: {str(e)}")
-                st.markdown('</div>', unsafe_allow_html=True)
-                return None, None, None
-    
-    st.markdown('</div>', unsafe_allow_html=True)
+        
+        if st.button("🔄 Generate Time Windows", use_container_width=True):
+            if timestamp_col:
+                try:
+                    df_updated, earliest_col, latest_col = generate_time_windows_from_timestamp(
+                        df, timestamp_col, sla_hours, window_type
+                    )
+                    
+                    st.success(f"✅ Time windows generated! New columns: `{earliest_col}`, `{latest_col}`")
+                    st.info(f"💡 You can now map these columns in the Column Mapping section above.")
+                    
+                    # Auto-update column mapping if not already set
+                    if 'earliest_time' not in st.session_state.column_mapping or not st.session_state.column_mapping.get('earliest_time'):
+                        st.session_state.column_mapping['earliest_time'] = earliest_col
+                    if 'latest_time' not in st.session_state.column_mapping or not st.session_state.column_mapping.get('latest_time'):
+                        st.session_state.column_mapping['latest_time'] = latest_col
+                    
+                    return df_updated, earliest_col, latest_col
+                except Exception as e:
+                    st.error(f"❌ Error generating time windows: {str(e)}")
+                    return None, None, None
+        
     return None, None, None
 
@@ -8,6 +8,17 @@ from typing import Dict
 import streamlit as st
 
 
+# Fairness index (coefficient of variation) bands: below 0.3 is Good,
+# below 0.5 Moderate, anything higher Poor
+FAIRNESS_THRESHOLDS = np.array([0.3, 0.5])
+FAIRNESS_LABELS = ('Good', 'Moderate', 'Poor')
+
+
+def _fairness_label(fairness_index: float) -> str:
+    """Good/Moderate/Poor band for a fairness index."""
+    return FAIRNESS_LABELS[int(np.searchsorted(FAIRNESS_THRESHOLDS, fairness_index, side='right'))]
+
+
 def compute_utilization_metrics(solution: Dict) -> Dict:
     """
     Compute utilization and fairness metrics for routes.
@@ -30,41 +41,21 @@ def compute_utilization_metrics(solution: Dict) -> Dict:
             'fairness_index_load': None,
         }
     
-    # Extract metrics per route
-    distances = []
-    durations = []
-    loads = []
-    
-    for route in route_details:
-        distances.append(route.get('distance', 0))
-        durations.append(route.get('time', 0) / 60)  # Convert to hours
-        loads.append(route.get('demand', 0))
-    
-    distances = np.array(distances)
-    durations = np.array(durations)
-    loads = np.array(loads)
-    
-    # Compute statistics
-    distance_stats = {
-        'min': float(np.min(distances)) if len(distances) > 0 else 0,
-        'max': float(np.max(distances)) if len(distances) > 0 else 0,
-        'mean': float(np.mean(distances)) if len(distances) > 0 else 0,
-        'std': float(np.std(distances)) if len(distances) > 0 else 0,
-    }
-    
-    duration_stats = {
-        'min': float(np.min(durations)) if len(durations) > 0 else 0,
-        'max': float(np.max(durations)) if len(durations) > 0 else 0,
-        'mean': float(np.mean(durations)) if len(durations) > 0 else 0,
-        'std': float(np.std(durations)) if len(durations) > 0 else 0,
-    }
-    
-    load_stats = {
-        'min': float(np.min(loads)) if len(loads) > 0 else 0,
-        'max': float(np.max(loads)) if len(loads) > 0 else 0,
-        'mean': float(np.mean(loads)) if len(loads) > 0 else 0,
-        'std': float(np.std(loads)) if len(loads) > 0 else 0,
-    }
+    # Extract metrics per route straight into the rows of one (3, N) array:
+    # distance, duration, load
+    n_routes = len(route_details)
+    metrics = np.empty((3, n_routes), dtype=np.float64)
+    metrics[0] = np.fromiter((route.get('distance', 0) for route in route_details), dtype=np.float64, count=n_routes)
+    metrics[1] = np.fromiter((route.get('time', 0) for route in route_details), dtype=np.float64, count=n_routes)
+    metrics[1] /= 60  # Convert to hours
+    metrics[2] = np.fromiter((route.get('demand', 0) for route in route_details), dtype=np.float64, count=n_routes)
+    
+    # Compute statistics: each reduction covers all three metrics at once
+    mins, maxs, means, stds = metrics.min(axis=1), metrics.max(axis=1), metrics.mean(axis=1), metrics.std(axis=1)
+    distance_stats, duration_stats, load_stats = (
+        {'min': float(mins[k]), 'max': float(maxs[k]), 'mean': float(means[k]), 'std': float(stds[k])}
+        for k in range(3)
+    )
     
     # Fairness index (coefficient of variation = std/mean)
     fairness_index_distance = None
@@ -95,103 +86,91 @@ def render_utilization_ui(solution: Dict):
     if not solution or 'route_details' not in solution:
         return
     
-    metrics = compute_utilization_metrics(solution)
-    
-    st.markdown('<div class="milesage-card">', unsafe_allow_html=True)
-    st.markdown("### ⚖️ Utilization & Fairness Metrics")
-    st.markdown("Route balance analytics to assess workload distribution across vehicles.")
-    
-    # Summary table
-    summary_data = []
-    summary_data.append({
-        'Metric': 'Route Count',
-        'Value': f"{metrics['route_count']}",
-        'Unit': 'routes'
-    })
-    
-    # Distance metrics
-    dist_stats = metrics['distance_stats']
-    summary_data.append({
-        'Metric': 'Distance - Min',
-        'Value': f"{dist_stats['min']:.2f}",
-        'Unit': 'km'
-    })
-    summary_data.append({
-        'Metric': 'Distance - Max',
-        'Value': f"{dist_stats['max']:.2f}",
-        'Unit': 'km'
-    })
-    summary_data.append({
-        'Metric': 'Distance - Mean',
-        'Value': f"{dist_stats['mean']:.2f}",
-        'Unit': 'km'
-    })
-    summary_data.append({
-        'Metric': 'Distance - Std Dev',
-        'Value': f"{dist_stats['std']:.2f}",
-        'Unit': 'km'
-    })
-    
-    # Fairness index
-    if metrics['fairness_index_distance'] is not None:
-        fairness_label = "Good" if metrics['fairness_index_distance'] < 0.3 else \
-                        "Moderate" if metrics['fairness_index_distance'] < 0.5 else "Poor"
-        summary_data.append({
-            'Metric': 'Distance Fairness Index',
-            'Value': f"{metrics['fairness_index_distance']:.3f} ({fairness_label})",
-            'Unit': 'coefficient of variation'
-        })
-    
-    # Load metrics
-    load_stats = metrics['load_stats']
-    summary_data.append({
-        'Metric': 'Load - Min',
-        'Value': f"{load_stats['min']:.1f}",
-        'Unit': 'units'
-    })
-    summary_data.append({
-        'Metric': 'Load - Max',
-        'Value': f"{load_stats['max']:.1f}",
-        'Unit': 'units'
-    })
-    summary_data.append({
-        'Metric': 'Load - Mean',
-        'Value': f"{load_stats['mean']:.1f}",
-        'Unit': 'units'
-    })
-    
-    if metrics['fairness_index_load'] is not None:
-        fairness_label = "Good" if metrics['fairness_index_load'] < 0.3 else \
-                        "Moderate" if metrics['fairness_index_load'] < 0.5 else "Poor"
-        summary_data.append({
-            'Metric': 'Load Fairness Index',
-            'Value': f"{metrics['fairness_index_load']:.3f} ({fairness_label})",
-            'Unit': 'coefficient of variation'
-        })
-    
-    summary_df = pd.DataFrame(summary_data)
-    st.dataframe(summary_df, use_container_width=True, hide_index=True)
-    
-    # Per-vehicle breakdown
-    st.markdown("#### Per-Vehicle Breakdown")
-    vehicle_data = []
-    for route in solution['route_details']:
-        vehicle_data.append({
-            'Vehicle ID': route.get('vehicle_id', 'Unknown'),
-            'Stops': route.get('n_stops', 0),
-            'Distance (km)': f"{route.get('distance', 0):.2f}",
-            'Duration (hrs)': f"{route.get('time', 0) / 60:.2f}",
-            'Load': f"{route.get('demand', 0):.1f}",
+    # Memoized against the solution object, so reruns from unrelated widgets
+    # skip the per-route extraction until the next solve
+    memo = st.session_state.get('utilization_metrics_memo')
+    if memo is None or memo[0] is not solution:
+        memo = (solution, compute_utilization_metrics(solution))
+        st.session_state.utilization_metrics_memo = memo
+    metrics = memo[1]
+    
+    with st.container(border=True):
+        st.markdown("### ⚖️ Utilization & Fairness Metrics")
+        st.markdown("Route balance analytics to assess workload distribution across vehicles.")
+        
+        # Summary table, gathered as (metric, value, unit) rows and handed to
+        # pandas column-wise
+        dist_stats = metrics['distance_stats']
+        load_stats = metrics['load_stats']
+        rows = [
+            ('Route Count', f"{metrics['route_count']}", 'routes'),
+            # Distance metrics
+            ('Distance - Min', f"{dist_stats['min']:.2f}", 'km'),
+            ('Distance - Max', f"{dist_stats['max']:.2f}", 'km'),
+            ('Distance - Mean', f"{dist_stats['mean']:.2f}", 'km'),
+            ('Distance - Std Dev', f"{dist_stats['std']:.2f}", 'km'),
+        ]
+        
+        # Fairness index
+        if metrics['fairness_index_distance'] is not None:
+            fairness_label = _fairness_label(metrics['fairness_index_distance'])
+            rows.append((
+                'Distance Fairness Index',
+                f"{metrics['fairness_index_distance']:.3f} ({fairness_label})",
+                'coefficient of variation',
+            ))
+        
+        # Load metrics
+        rows += [
+            ('Load - Min', f"{load_stats['min']:.1f}", 'units'),
+            ('Load - Max', f"{load_stats['max']:.1f}", 'units'),
+            ('Load - Mean', f"{load_stats['mean']:.1f}", 'units'),
+        ]
+        
+        if metrics['fairness_index_load'] is not None:
+            fairness_label = _fairness_label(metrics['fairness_index_load'])
+            rows.append((
+                'Load Fairness Index',
+                f"{metrics['fairness_index_load']:.3f} ({fairness_label})",
+                'coefficient of variation',
+            ))
+        
+        # Text-only table: Arrow-backed strings go to Streamlit's Arrow
+        # serializer without converting object columns (pyarrow ships with
+        # Streamlit)
+        metric_names, values, units = zip(*rows)
+        summary_df = pd.DataFrame(
+            {'Metric': metric_names, 'Value': values, 'Unit': units},
+            dtype='string[pyarrow]',
+        )
+        st.dataframe(summary_df, use_container_width=True, hide_index=True)
+        
+        # Per-vehicle breakdown
+        st.markdown("#### Per-Vehicle Breakdown")
+        route_details = solution['route_details']
+        n_routes = len(route_details)
+        # Numeric columns; st.dataframe formats them via column_config
+        vehicle_df = pd.DataFrame({
+            'Vehicle ID': [route.get('vehicle_id', 'Unknown') for route in route_details],
+            'Stops': np.fromiter((route.get('n_stops', 0) for route in route_details), dtype=np.int64, count=n_routes),
+            'Distance (km)': np.fromiter((route.get('distance', 0) for route in route_details), dtype=np.float64, count=n_routes),
+            'Duration (hrs)': np.fromiter((route.get('time', 0) for route in route_details), dtype=np.float64, count=n_routes) / 60,
+            'Load': np.fromiter((route.get('demand', 0) for route in route_details), dtype=np.float64, count=n_routes),
         })
-    
-    vehicle_df = pd.DataFrame(vehicle_data)
-    st.dataframe(vehicle_df, use_container_width=True, hide_index=True)
-    
-    # Interpretation
-    st.info(
-        "💡 **Fairness Index**: Lower is better (0 = perfectly balanced). "
-        "Values < 0.3 indicate good balance, > 0.5 indicates significant imbalance."
-    )
-    
-    st.markdown('</div>', unsafe_allow_html=True)
+        st.dataframe(
+            vehicle_df,
+            use_container_width=True,
+            hide_index=True,
+            column_config={
+                'Distance (km)': st.column_config.NumberColumn(format='%.2f'),
+                'Duration (hrs)': st.column_config.NumberColumn(format='%.2f'),
+                'Load': st.column_config.NumberColumn(format='%.1f'),
+            },
+        )
+        
+        # Interpretation
+        st.info(
+            "💡 **Fairness Index**: Lower is better (0 = perfectly balanced). "
+            "Values < 0.3 indicate good balance, > 0.5 indicates significant imbalance."
+        )
 
@@ -1,16 +1,36 @@
 """
 Visualization utilities for Milesage - Last-Mile Optimizer
 
-Handles map visualization using Folium and summary plots.
+Handles map visualization using pydeck/Folium and summary plots.
 """
 
 import pandas as pd
 import numpy as np
-import folium
-from folium.plugins import Fullscreen
-from streamlit_folium import st_folium
+import pydeck as pdk
+from functools import lru_cache
 from typing import Dict, List, Optional
 
+# Above this many stops the Folium map draws customer stops with one
+# client-side FastMarkerCluster instead of a CircleMarker per stop
+FOLIUM_FAST_MARKERS_MIN_STOPS = 1000
+
+
+# Color palette matching dark theme dashboard (yellow, orange, blues, greens, purples)
+_BASE_COLORS = np.array([
+    [255, 193, 7],    # Yellow/Amber (FFC107) - Primary accent
+    [255, 152, 0],    # Orange (FF9800)
+    [33, 150, 243],   # Light Blue (2196F3)
+    [76, 175, 80],    # Green (4CAF50)
+    [156, 39, 176],   # Purple (9C27B0)
+    [244, 67, 54],    # Red (F44336)
+    [0, 188, 212],    # Cyan (00BCD4)
+    [255, 235, 59],   # Bright Yellow (FFEB3B)
+    [255, 87, 34],    # Deep Orange (FF5722)
+    [63, 81, 181],    # Indigo (3F51B5)
+    [0, 150, 136],    # Teal (009688)
+    [233, 30, 99],    # Pink (E91E63)
+], dtype=np.uint8)
+
 
 def get_route_colors(n_routes: int) -> List[List[int]]:
     """
@@ -22,34 +42,109 @@ def get_route_colors(n_routes: int) -> List[List[int]]:
     Returns:
         List of RGB color tuples [R, G, B] where each value is 0-255
     """
-    # Color palette matching dark theme dashboard (yellow, orange, blues, greens, purples)
-    colors = [
-        [255, 193, 7],    # Yellow/Amber (FFC107) - Primary accent
-        [255, 152, 0],    # Orange (FF9800)
-        [33, 150, 243],   # Light Blue (2196F3)
-        [76, 175, 80],    # Green (4CAF50)
-        [156, 39, 176],   # Purple (9C27B0)
-        [244, 67, 54],    # Red (F44336)
-        [0, 188, 212],    # Cyan (00BCD4)
-        [255, 235, 59],   # Bright Yellow (FFEB3B)
-        [255, 87, 34],    # Deep Orange (FF5722)
-        [63, 81, 181],    # Indigo (3F51B5)
-        [0, 150, 136],    # Teal (009688)
-        [233, 30, 99],    # Pink (E91E63)
+    # The palette repeats once there are more routes than base colors
+    return _BASE_COLORS[np.arange(n_routes) % len(_BASE_COLORS)].tolist()
+
+
+def create_route_map_pydeck(
+    df: pd.DataFrame,
+    solution: Dict,
+    height: int = 650
+) -> pdk.Deck:
+    """
+    Create a WebGL route map: one PathLayer for routes, one ScatterplotLayer for stops.
+    
+    Only compact coordinate arrays are sent to the browser, so this stays
+    responsive for route sets that are too large for the Folium map.
+    
+    Args:
+        df: Normalized DataFrame with stops
+        solution: Solution dictionary with 'route_details'
+        height: Map height in pixels
+    
+    Returns:
+        pydeck.Deck object
+    """
+    # Positional [lon, lat] lookup; 5 decimals (~1 m) keeps the JSON short
+    coords = np.round(df[['lon', 'lat']].to_numpy(dtype=np.float64), 5)
+    stop_ids = df['stop_id'].astype(str).to_numpy()
+    is_depot = df['is_depot'].to_numpy(dtype=bool)
+    position = pd.Series(np.arange(len(df)), index=df.index)
+    
+    paths = []
+    stops = []
+    route_details = [r for r in solution['route_details'] if len(r['stops']) >= 3]
+    colors = get_route_colors(len(route_details))
+    for route_detail, color in zip(route_details, colors):
+        vehicle_id = route_detail['vehicle_id']
+        idx = position.loc[route_detail['stops']].to_numpy()
+        paths.append({
+            'path': coords[idx].tolist(),
+            'color': color,
+            'label': f"Vehicle {vehicle_id} Route"
+        })
+        for i in idx[1:-1]:
+            if not is_depot[i]:
+                stops.append({
+                    'position': coords[i].tolist(),
+                    'color': color,
+                    'radius': 60,
+                    'label': f"Vehicle {vehicle_id} - {stop_ids[i]}"
+                })
+    
+    for i in np.flatnonzero(is_depot):
+        stops.append({
+            'position': coords[i].tolist(),
+            'color': [251, 191, 36],
+            'radius': 150,
+            'label': f"Depot: {stop_ids[i]}"
+        })
+    
+    layers = [
+        pdk.Layer(
+            'PathLayer',
+            data=paths,
+            get_path='path',
+            get_color='color',
+            width_min_pixels=3,
+            opacity=0.7,
+            pickable=True
+        ),
+        pdk.Layer(
+            'ScatterplotLayer',
+            data=stops,
+            get_position='position',
+            get_fill_color='color',
+            get_radius='radius',
+            radius_min_pixels=4,
+            stroked=True,
+            get_line_color=[26, 58, 63],
+            line_width_min_pixels=1,
+            pickable=True
+        ),
     ]
     
-    # Repeat colors if needed
-    while len(colors) < n_routes:
-        colors.extend(colors)
+    view_state = pdk.ViewState(
+        latitude=float(df['lat'].mean()),
+        longitude=float(df['lon'].mean()),
+        zoom=10
+    )
     
-    return colors[:n_routes]
+    return pdk.Deck(
+        layers=layers,
+        initial_view_state=view_state,
+        map_provider='carto',
+        map_style='light',
+        tooltip={'text': '{label}'},
+        height=height
+    )
 
 
 def create_route_map_folium(
     df: pd.DataFrame,
     solution: Dict,
     solution_name: str = 'Solution'
-) -> folium.Map:
+) -> "folium.Map":
     """
     Create an interactive Folium map showing routes with real street tiles.
     
@@ -61,6 +156,11 @@ def create_route_map_folium(
     Returns:
         folium.Map object
     """
+    # Imported here: the app draws routes with pydeck, so folium is only
+    # loaded when this map is actually built
+    import folium
+    from folium.plugins import FastMarkerCluster, Fullscreen
+    
     # Get center of map
     center_lat = df['lat'].mean()
     center_lon = df['lon'].mean()
@@ -96,20 +196,46 @@ def create_route_map_folium(
         "#06B6D4",  # Cyan
     ]
     
-    # Add depot marker (larger, yellow/amber color)
-    depot_df = df[df['is_depot']].copy()
-    for idx, row in depot_df.iterrows():
-        folium.CircleMarker(
-            location=[row['lat'], row['lon']],
-            radius=12,
-            popup=folium.Popup(f"<b>Depot</b><br>Stop ID: {row['stop_id']}", max_width=200),
-            tooltip=f"Depot: {row['stop_id']}",
-            color="#1A3A3F",  # Dark border
-            weight=2,
-            fillColor="#FBBF24",  # Yellow/Amber accent
-            fillOpacity=0.9
+    # Stop attributes as plain arrays; routes hold index labels, which are
+    # mapped to row positions once per route and gathered in one take
+    lat = df['lat'].to_numpy(dtype=np.float64)
+    lon = df['lon'].to_numpy(dtype=np.float64)
+    is_depot = df['is_depot'].to_numpy(dtype=bool)
+    stop_ids = df['stop_id'].astype(str).to_numpy()
+    demands = df['demand'].to_numpy()
+    
+    # Add depot markers (larger, yellow/amber color) as a single GeoJSON
+    # layer, taken from the is_depot-masked arrays
+    depot_features = [
+        {
+            'type': 'Feature',
+            'geometry': {'type': 'Point', 'coordinates': [depot_lon, depot_lat]},
+            'properties': {'label': f"Depot: {depot_id}", 'stop_id': depot_id},
+        }
+        for depot_lat, depot_lon, depot_id in zip(
+            lat[is_depot].tolist(),
+            lon[is_depot].tolist(),
+            stop_ids[is_depot].tolist(),
+        )
+    ]
+    if depot_features:
+        folium.GeoJson(
+            {'type': 'FeatureCollection', 'features': depot_features},
+            marker=folium.CircleMarker(radius=12, fill=True),
+            style_function=lambda feature: {
+                'color': "#1A3A3F",  # Dark border
+                'weight': 2,
+                'fillColor': "#FBBF24",  # Yellow/Amber accent
+                'fillOpacity': 0.9,
+            },
+            tooltip=folium.GeoJsonTooltip(fields=['label'], labels=False),
+            popup=folium.GeoJsonPopup(fields=['stop_id'], aliases=['Depot stop ID'], max_width=200),
         ).add_to(m)
     
+    # Large maps hand customer stops to the browser in one flat list
+    fast_markers = len(df) >= FOLIUM_FAST_MARKERS_MIN_STOPS
+    fast_marker_positions = []
+    
     # Add routes and customer stops
     for route_detail in solution['route_details']:
         vehicle_id = route_detail['vehicle_id']
@@ -122,9 +248,8 @@ def create_route_map_folium(
         color = route_colors[vehicle_id % len(route_colors)]
         
         # Create route path coordinates
-        route_coords = []
-        for stop_idx in route_stops:
-            route_coords.append([df.loc[stop_idx, 'lat'], df.loc[stop_idx, 'lon']])
+        idx = df.index.get_indexer(route_stops)
+        route_coords = np.column_stack((lat[idx], lon[idx])).tolist()
         
         # Draw route line (PolyLine)
         folium.PolyLine(
@@ -135,36 +260,65 @@ def create_route_map_folium(
             tooltip=f"Vehicle {vehicle_id} Route"
         ).add_to(m)
         
-        # Add customer stop markers for this route
-        for stop_idx in route_stops[1:-1]:  # Exclude depot at start and end
-            stop_row = df.loc[stop_idx]
-            if not stop_row['is_depot']:
-                folium.CircleMarker(
-                    location=[stop_row['lat'], stop_row['lon']],
-                    radius=6,
-                    popup=folium.Popup(
-                        f"<b>Vehicle {vehicle_id}</b><br>Stop ID: {stop_row['stop_id']}<br>"
-                        f"Demand: {stop_row['demand']}", 
-                        max_width=200
-                    ),
-                    tooltip=f"Vehicle {vehicle_id} - {stop_row['stop_id']}",
-                    color=color,
-                    weight=2,
-                    fillColor=color,
-                    fillOpacity=0.8
-                ).add_to(m)
+        customers = idx[1:-1]  # Exclude depot at start and end
+        customers = customers[~is_depot[customers]]
+        
+        if fast_markers:
+            fast_marker_positions.append(customers)
+            continue
+        
+        # Add customer stop markers for this route: one GeoJSON layer per
+        # route instead of a CircleMarker (and its JS snippet) per stop
+        features = [
+            {
+                'type': 'Feature',
+                'geometry': {'type': 'Point', 'coordinates': [stop_lon, stop_lat]},
+                'properties': {
+                    'label': f"Vehicle {vehicle_id} - {stop_id}",
+                    'vehicle': str(vehicle_id),
+                    'stop_id': stop_id,
+                    'demand': demand,
+                },
+            }
+            for stop_lat, stop_lon, stop_id, demand in zip(
+                lat[customers].tolist(),
+                lon[customers].tolist(),
+                stop_ids[customers].tolist(),
+                demands[customers].tolist(),
+            )
+        ]
+        if features:
+            folium.GeoJson(
+                {'type': 'FeatureCollection', 'features': features},
+                marker=folium.CircleMarker(radius=6, weight=2, fill=True),
+                style_function=lambda feature, color=color: {
+                    'color': color,
+                    'fillColor': color,
+                    'fillOpacity': 0.8,
+                },
+                tooltip=folium.GeoJsonTooltip(fields=['label'], labels=False),
+                popup=folium.GeoJsonPopup(
+                    fields=['vehicle', 'stop_id', 'demand'],
+                    aliases=['Vehicle', 'Stop ID', 'Demand'],
+                    max_width=200,
+                ),
+            ).add_to(m)
+    
+    if fast_marker_positions:
+        customers = np.concatenate(fast_marker_positions)
+        FastMarkerCluster(np.column_stack((lat[customers], lon[customers])).tolist()).add_to(m)
     
     # Add legend using folium's HTML template (Jinja2)
     from branca.element import MacroElement, Template
     
-    # Build legend items HTML
-    legend_items_html = ''
-    for route_detail in solution['route_details']:
-        if len(route_detail['stops']) >= 3:
-            vehicle_id = route_detail['vehicle_id']
-            color = route_colors[vehicle_id % len(route_colors)]
-            n_stops = route_detail['n_stops']
-            legend_items_html += f'<div style="margin: 4px 0;"><span style="color: {color}; font-size: 18px; font-weight: bold;">●</span> Vehicle {vehicle_id} ({n_stops} stops)</div>'
+    # Build legend items HTML in one join over the non-empty routes
+    legend_items_html = ''.join(
+        f'<div style="margin: 4px 0;"><span style="color: {route_colors[route_detail["vehicle_id"] % len(route_colors)]}; '
+        f'font-size: 18px; font-weight: bold;">●</span> '
+        f'Vehicle {route_detail["vehicle_id"]} ({route_detail["n_stops"]} stops)</div>'
+        for route_detail in solution['route_details']
+        if len(route_detail['stops']) >= 3
+    )
     
     # Build template string - avoid f-string conflict with Jinja2 syntax
     template_start = '{% macro html(this, kwargs) %}'
@@ -294,13 +448,34 @@ def generate_business_summary(
     Returns:
         Formatted summary string
     """
-    naive_dist = naive_solution['total_distance']
-    opt_dist = optimized_solution['total_distance']
-    naive_time = naive_solution['total_time'] / 60  # Convert to hours
-    opt_time = optimized_solution['total_time'] / 60
-    naive_veh = naive_solution['n_vehicles_used']
-    opt_veh = optimized_solution['n_vehicles_used']
-    
+    # Reruns pass the same solution totals and cost parameters, so the
+    # formatted text comes from the cache after the first render
+    return _business_summary_text(
+        naive_solution['total_distance'],
+        optimized_solution['total_distance'],
+        naive_solution['total_time'] / 60,  # Convert to hours
+        optimized_solution['total_time'] / 60,
+        naive_solution['n_vehicles_used'],
+        optimized_solution['n_vehicles_used'],
+        cost_per_km,
+        fixed_cost_per_vehicle,
+        cost_per_hour,
+    )
+
+
+@lru_cache(maxsize=64)
+def _business_summary_text(
+    naive_dist: float,
+    opt_dist: float,
+    naive_time: float,
+    opt_time: float,
+    naive_veh: int,
+    opt_veh: int,
+    cost_per_km: float,
+    fixed_cost_per_vehicle: float,
+    cost_per_hour: float
+) -> str:
+    """Business summary text from scalar totals (times in hours); see generate_business_summary."""
     # Calculate costs
     naive_cost = (naive_dist * cost_per_km + 
                   naive_veh * fixed_cost_per_vehicle + 
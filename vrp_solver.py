@@ -4,12 +4,195 @@ VRP solver module for Milesage - Last-Mile Optimizer
 Implements both a naive nearest-neighbor heuristic and OR-Tools-based VRP optimization.
 """
 
+import atexit
+import os
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import shared_memory
 import numpy as np
 import pandas as pd
 from typing import Dict, List, Tuple, Optional
 from ortools.constraint_solver import routing_enums_pb2
 from ortools.constraint_solver import pywrapcp
 
+from _kernels import NUMBA_AVAILABLE, nearest_neighbor_multistart, nearest_neighbor_routes
+
+
+# First-solution strategies tried side by side by run_multistart_solution
+STRATEGIES = ['PATH_CHEAPEST_ARC', 'SAVINGS', 'PARALLEL_CHEAPEST_INSERTION', 'CHRISTOFIDES']
+
+
+def _nearest_neighbor_routes_numpy(
+    distance_matrix: np.ndarray,
+    time_matrix: np.ndarray,
+    demand: np.ndarray,
+    service_time: np.ndarray,
+    earliest_time: np.ndarray,
+    latest_time: np.ndarray,
+    is_depot: np.ndarray,
+    depot_idx: int,
+    n_vehicles: int,
+    use_capacity: bool,
+    vehicle_capacity: float,
+    use_duration: bool,
+    max_duration_minutes: float,
+    depot_open: float,
+    depot_close: float,
+    good_enough_km: float = 0.0,
+    first_stops: Optional[np.ndarray] = None,
+) -> List[List[int]]:
+    """
+    NumPy fallback for _kernels.nearest_neighbor_routes (same arguments).
+    
+    first_stops optionally holds each vehicle's opening stop (-1 for the
+    nearest), as one row of the _kernels.nearest_neighbor_multistart input.
+    
+    Returns:
+        One stop list per vehicle started, depot at both ends
+    """
+    routes = []
+    unvisited = ~is_depot
+    n_unvisited = int(unvisited.sum())
+    
+    # Travel time from every stop back to the depot, read once as a column
+    time_to_depot = time_matrix[:, depot_idx].astype(np.float64)
+    
+    for vehicle_id in range(n_vehicles):
+        if not n_unvisited:
+            break
+        
+        # Start route at depot
+        route = [depot_idx]
+        current_capacity = 0.0
+        current_time = np.float64(depot_open)  # Start at depot opening time
+        
+        while n_unvisited:
+            current_idx = route[-1]
+            
+            # Find nearest unvisited customer that satisfies constraints:
+            # every candidate is checked at once with boolean masks, then
+            # the closest feasible one is picked by argmin
+            feasible = unvisited.copy()
+            
+            # Check capacity constraint
+            if use_capacity:
+                feasible &= current_capacity + demand <= vehicle_capacity
+            
+            # Check duration constraint
+            if use_duration:
+                # Wait until earliest time, then check the time window
+                arrival_time = np.maximum(current_time + time_matrix[current_idx], earliest_time)
+                feasible &= arrival_time <= latest_time
+                
+                # Check if we can return to depot in time
+                return_time = arrival_time + service_time + time_to_depot
+                feasible &= return_time <= depot_close
+                feasible &= return_time - depot_open <= max_duration_minutes
+            
+            forced = first_stops[vehicle_id] if first_stops is not None and len(route) == 1 else -1
+            if forced >= 0 and feasible[forced]:
+                best_next = int(forced)
+            else:
+                candidate_distance = np.where(feasible, distance_matrix[current_idx], np.inf)
+                # First feasible stop within good_enough_km, as the compiled
+                # scan stops at; otherwise the nearest
+                close_enough = np.flatnonzero(candidate_distance <= good_enough_km)
+                best_next = int(close_enough[0]) if len(close_enough) else int(candidate_distance.argmin())
+                if not feasible[best_next]:
+                    break  # No feasible next stop
+            
+            # Add best next stop to route
+            route.append(best_next)
+            unvisited[best_next] = False
+            n_unvisited -= 1
+            
+            # Update capacity and time
+            if use_capacity:
+                current_capacity += demand[best_next]
+            
+            if use_duration:
+                current_time = arrival_time[best_next] + service_time[best_next]
+        
+        # Return to depot
+        route.append(depot_idx)
+        routes.append(route)
+    
+    return routes
+
+
+def _summarize_routes(
+    routes: List[List[int]],
+    vehicle_ids: List[int],
+    distance_matrix: np.ndarray,
+    time_matrix: np.ndarray,
+    service_time: np.ndarray,
+    demand: np.ndarray,
+    count_return_leg: bool = True,
+) -> Tuple[List[Dict], float, float]:
+    """
+    Route details and totals for non-empty depot-to-depot routes.
+    
+    All routes are concatenated into one stop array, every leg is gathered
+    from the matrices in one indexing pass, and per-route sums come from
+    np.add.reduceat; legs between consecutive routes and the depot visits'
+    service times and demands are masked out.
+    
+    Args:
+        routes: Stop lists with the depot at both ends
+        vehicle_ids: Vehicle of each route
+        distance_matrix, time_matrix: NxN matrices
+        service_time, demand: Per-stop float64 arrays
+        count_return_leg: Whether the last leg back to the depot counts
+            toward route distance and time
+    
+    Returns:
+        Tuple of (route_details, total_distance, total_time)
+    """
+    if not routes:
+        return [], 0, 0
+    
+    lengths = np.array([len(route) for route in routes], dtype=np.intp)
+    ends = np.cumsum(lengths)
+    starts = ends - lengths
+    stops = np.concatenate(routes).astype(np.intp, copy=False)
+    
+    # Leg k runs from stops[k] to stops[k + 1]; leg ends[r] - 1 would join
+    # route r to route r + 1 and leg ends[r] - 2 is route r's return leg
+    leg_mask = np.ones(len(stops) - 1, dtype=bool)
+    leg_mask[ends[:-1] - 1] = False
+    if not count_return_leg:
+        leg_mask[ends - 2] = False
+    leg_distance = np.where(leg_mask, distance_matrix[stops[:-1], stops[1:]], 0).astype(np.float64)
+    leg_time = np.where(leg_mask, time_matrix[stops[:-1], stops[1:]], 0).astype(np.float64)
+    
+    # Service times and demands of the stops between the depot visits
+    stop_mask = np.ones(len(stops), dtype=bool)
+    stop_mask[starts] = False
+    stop_mask[ends - 1] = False
+    stop_service = np.where(stop_mask, service_time[stops], 0)
+    stop_demand = np.where(stop_mask, demand[stops], 0)
+    
+    route_distance = np.add.reduceat(leg_distance, starts)
+    route_time = np.add.reduceat(leg_time, starts) + np.add.reduceat(stop_service, starts)
+    route_demand = np.add.reduceat(stop_demand, starts)
+    
+    route_details = [
+        {
+            'vehicle_id': vehicle_id,
+            'stops': stops[start:end],
+            'distance': distance,
+            'time': duration,
+            'demand': route_load,
+            'n_stops': int(end - start) - 2  # Exclude depot at start/end
+        }
+        for vehicle_id, start, end, distance, duration, route_load in zip(
+            vehicle_ids, starts.tolist(), ends.tolist(), route_distance, route_time, route_demand
+        )
+    ]
+    return route_details, route_distance.sum(), route_time.sum()
+
 
 def run_naive_solution(
     df: pd.DataFrame,
@@ -18,27 +201,47 @@ def run_naive_solution(
     n_vehicles: int,
     vehicle_capacity: Optional[float] = None,
     max_route_duration_hours: Optional[float] = None,
-    depot_time_window: Tuple[int, int] = (480, 1200)  # 8:00-20:00 in minutes
+    depot_time_window: Tuple[int, int] = (480, 1200),  # 8:00-20:00 in minutes
+    n_starts: int = 1,
+    seed: Optional[int] = 0,
+    good_enough_km: float = 0.0
 ) -> Dict:
     """
     Run a naive nearest-neighbor heuristic for VRP.
     
+    With n_starts > 1 the construction is repeated with random opening stops
+    for the vehicles (start 0 stays pure nearest-neighbor) and the result
+    serving the most stops, then the shortest, is kept. The default single
+    start is the deterministic baseline the optimized solution is compared
+    against.
+    
     Args:
         df: Normalized DataFrame with stops
-        distance_matrix: NxN distance matrix in km
-        time_matrix: NxN time matrix in minutes
+        distance_matrix: NxN distance matrix in km (row-major float32; other
+            layouts or dtypes are converted once on entry)
+        time_matrix: NxN time matrix in minutes (same layout as distance_matrix)
         n_vehicles: Number of vehicles available
         vehicle_capacity: Vehicle capacity (None to disable capacity constraint)
         max_route_duration_hours: Maximum route duration in hours (None to disable)
         depot_time_window: (start_minutes, end_minutes) for depot operating hours
+        n_starts: Number of constructions to run (parallel with Numba)
+        seed: Random seed for the opening stops of starts after the first
+        good_enough_km: Take the first feasible stop at most this far away
+            instead of the nearest one, which stops the candidate scan early
+            (0.0 keeps the exact nearest neighbor)
     
     Returns:
         Dictionary with solution details:
         - routes: List of routes, each route is a list of stop indices
         - total_distance: Total distance in km
         - total_time: Total time in minutes
-        - route_details: List of dicts with per-route metrics
+        - route_details: List of dicts with per-route metrics ('stops' as an np.intp array)
     """
+    # Both solvers scan whole matrix rows; keep them C-contiguous float32 so
+    # a row is one dense run in cache (a no-op for the matrices built by
+    # data_utils, which already are)
+    distance_matrix = np.ascontiguousarray(distance_matrix, dtype=np.float32)
+    time_matrix = np.ascontiguousarray(time_matrix, dtype=np.float32)
     n = int(len(df))
     n_vehicles = int(n_vehicles)
     if n < 2 or n_vehicles < 1:
@@ -50,139 +253,72 @@ def run_naive_solution(
             'n_vehicles_used': 0,
             'error': 'Not enough stops or vehicles to build routes.'
         }
-    depot_idx = df[df['is_depot']].index[0]
-    customer_indices = df[~df['is_depot']].index.tolist()
+    # Per-stop attributes as plain arrays, read by integer index in the loops
+    # below instead of a df.loc label lookup per candidate. Missing time
+    # windows become -inf/+inf, which never trigger waiting or rejection.
+    is_depot = df['is_depot'].to_numpy(dtype=bool, copy=True)
+    demand = df['demand'].to_numpy(dtype=np.float64)
+    service_time = df['service_time'].to_numpy(dtype=np.float64)
+    earliest_time = np.nan_to_num(df['earliest_time'].to_numpy(dtype=np.float64, na_value=np.nan), nan=-np.inf)
+    latest_time = np.nan_to_num(df['latest_time'].to_numpy(dtype=np.float64, na_value=np.nan), nan=np.inf)
     
-    # Initialize routes
-    routes = []
-    unvisited = set(customer_indices)
+    depot_idx = int(np.argmax(is_depot))  # First depot row
     
     # Track whether we're using constraints
-    use_capacity = vehicle_capacity is not None and df['demand'].sum() > 0
+    use_capacity = bool(vehicle_capacity is not None and demand.sum() > 0)
     use_duration = max_route_duration_hours is not None
     
-    max_duration_minutes = max_route_duration_hours * 60 if use_duration else None
+    max_duration_minutes = max_route_duration_hours * 60 if use_duration else np.inf
     
-    for vehicle_id in range(n_vehicles):
-        if not unvisited:
-            break
-        
-        # Start route at depot
-        route = [depot_idx]
-        current_capacity = 0
-        current_time = depot_time_window[0]  # Start at depot opening time
-        
-        while unvisited:
-            current_idx = route[-1]
-            best_next = None
-            best_distance = float('inf')
-            
-            # Find nearest unvisited customer that satisfies constraints
-            for next_idx in unvisited:
-                # Check capacity constraint
-                if use_capacity:
-                    demand = df.loc[next_idx, 'demand']
-                    if current_capacity + demand > vehicle_capacity:
-                        continue
-                
-                # Check duration constraint
-                if use_duration:
-                    travel_time = time_matrix[current_idx, next_idx]
-                    service_time = df.loc[next_idx, 'service_time']
-                    arrival_time = current_time + travel_time
-                    
-                    # Check time window
-                    earliest = df.loc[next_idx, 'earliest_time']
-                    latest = df.loc[next_idx, 'latest_time']
-                    
-                    if earliest is not None:
-                        if arrival_time < earliest:
-                            arrival_time = earliest  # Wait until earliest time
-                    
-                    if latest is not None:
-                        if arrival_time > latest:
-                            continue  # Cannot meet time window
-                    
-                    departure_time = arrival_time + service_time
-                    
-                    # Check if we can return to depot in time
-                    return_time = departure_time + time_matrix[next_idx, depot_idx]
-                    if return_time > depot_time_window[1] or \
-                       (return_time - depot_time_window[0]) > max_duration_minutes:
-                        continue
-                
-                # Check distance
-                dist = distance_matrix[current_idx, next_idx]
-                if dist < best_distance:
-                    best_distance = dist
-                    best_next = next_idx
-            
-            if best_next is None:
-                break  # No feasible next stop
-            
-            # Add best next stop to route
-            route.append(best_next)
-            unvisited.remove(best_next)
-            
-            # Update capacity and time
-            if use_capacity:
-                current_capacity += df.loc[best_next, 'demand']
-            
-            if use_duration:
-                travel_time = time_matrix[current_idx, best_next]
-                service_time = df.loc[best_next, 'service_time']
-                
-                arrival_time = current_time + travel_time
-                earliest = df.loc[best_next, 'earliest_time']
-                if earliest is not None and arrival_time < earliest:
-                    arrival_time = earliest
-                
-                current_time = arrival_time + service_time
-        
-        # Return to depot
-        route.append(depot_idx)
-        routes.append(route)
+    route_args = (
+        distance_matrix, time_matrix, demand, service_time, earliest_time, latest_time, is_depot,
+        depot_idx, n_vehicles,
+        use_capacity, float(vehicle_capacity) if use_capacity else 0.0,
+        use_duration, float(max_duration_minutes),
+        float(depot_time_window[0]), float(depot_time_window[1]),
+        float(good_enough_km),
+    )
+    if n_starts > 1:
+        # Row 0 keeps the plain nearest-neighbor start; the others open each
+        # vehicle's route at a distinct random customer
+        rng = np.random.default_rng(seed)
+        customers = np.flatnonzero(~is_depot)
+        first_stops = np.full((int(n_starts), n_vehicles), -1, dtype=np.int64)
+        for row in first_stops[1:]:
+            picks = rng.permutation(customers)[:n_vehicles]
+            row[:len(picks)] = picks
     
-    # Compute route metrics
-    route_details = []
-    total_distance = 0
-    total_time = 0
+    if NUMBA_AVAILABLE:
+        # Compiled scan over candidates, no temporary masks per step
+        if n_starts > 1:
+            stops, offsets = nearest_neighbor_multistart(*route_args, first_stops)
+        else:
+            stops, offsets = nearest_neighbor_routes(*route_args)
+        routes = [stops[start:end].tolist() for start, end in zip(offsets[:-1].tolist(), offsets[1:].tolist())]
+    elif n_starts > 1:
+        routes = min(
+            (_nearest_neighbor_routes_numpy(*route_args, row) for row in first_stops),
+            key=lambda candidate: (
+                -sum(len(route) - 2 for route in candidate),
+                sum(float(distance_matrix[route[:-1], route[1:]].astype(np.float64).sum()) for route in candidate),
+            ),
+        )
+    else:
+        routes = _nearest_neighbor_routes_numpy(*route_args)
     
-    for vehicle_id, route in enumerate(routes):
-        if len(route) <= 2:  # Only depot -> depot
-            continue
-        
-        route_dist = 0
-        route_time = 0
-        route_demand = 0
-        
-        for i in range(len(route) - 1):
-            route_dist += distance_matrix[route[i], route[i+1]]
-            route_time += time_matrix[route[i], route[i+1]]
-        
-        # Add service times
-        for stop_idx in route[1:-1]:  # Exclude depot at start/end
-            route_time += df.loc[stop_idx, 'service_time']
-            route_demand += df.loc[stop_idx, 'demand']
-        
-        route_details.append({
-            'vehicle_id': vehicle_id,
-            'stops': route,
-            'distance': route_dist,
-            'time': route_time,
-            'demand': route_demand,
-            'n_stops': len(route) - 2  # Exclude depot at start/end
-        })
-        
-        total_distance += route_dist
-        total_time += route_time
+    # Compute route metrics
+    vehicle_ids = [vehicle_id for vehicle_id, route in enumerate(routes) if len(route) > 2]
+    route_details, total_distance, total_time = _summarize_routes(
+        [routes[vehicle_id] for vehicle_id in vehicle_ids], vehicle_ids,
+        distance_matrix, time_matrix, service_time, demand,
+    )
     
     return {
         'routes': routes,
         'total_distance': total_distance,
         'total_time': total_time,
         'route_details': route_details,
-        'n_vehicles_used': len([r for r in routes if len(r) > 2])
+        'n_vehicles_used': len(route_details)
     }
 
 
@@ -196,15 +332,17 @@ def run_ortools_solution(
     depot_time_window: Tuple[int, int] = (480, 1200),
     first_solution_strategy: str = 'PATH_CHEAPEST_ARC',
     local_search_metaheuristic: str = 'GUIDED_LOCAL_SEARCH',
-    time_limit_seconds: int = 30
+    time_limit_seconds: int = 30,
+    initial_routes: Optional[List[List[int]]] = None
 ) -> Dict:
     """
     Run OR-Tools VRP solver.
     
     Args:
         df: Normalized DataFrame with stops
-        distance_matrix: NxN distance matrix in km
-        time_matrix: NxN time matrix in minutes
+        distance_matrix: NxN distance matrix in km (row-major float32; other
+            layouts or dtypes are converted once on entry)
+        time_matrix: NxN time matrix in minutes (same layout as distance_matrix)
         n_vehicles: Number of vehicles available
         vehicle_capacity: Vehicle capacity (None to disable)
         max_route_duration_hours: Maximum route duration in hours (None to disable)
@@ -212,10 +350,18 @@ def run_ortools_solution(
         first_solution_strategy: OR-Tools first solution strategy
         local_search_metaheuristic: OR-Tools local search metaheuristic
         time_limit_seconds: Time limit for solver
+        initial_routes: Optional warm start, one stop list per vehicle (depot
+            ends optional, e.g. a previous solution's 'routes'). Ignored if it
+            is infeasible under the current constraints.
     
     Returns:
         Dictionary with solution details (same format as naive solution)
     """
+    # Both solvers scan whole matrix rows; keep them C-contiguous float32 so
+    # a row is one dense run in cache (a no-op for the matrices built by
+    # data_utils, which already are)
+    distance_matrix = np.ascontiguousarray(distance_matrix, dtype=np.float32)
+    time_matrix = np.ascontiguousarray(time_matrix, dtype=np.float32)
     n = int(len(df))
     n_vehicles = int(n_vehicles)
     if n < 2:
@@ -237,29 +383,29 @@ def run_ortools_solution(
             'error': 'Number of vehicles must be at least 1.'
         }
 
-    depot_idx = int(df[df['is_depot']].index[0])
+    is_depot = df['is_depot'].to_numpy(dtype=bool)
+    depot_idx = int(np.argmax(is_depot))  # First depot row
     
     # Create routing index manager
     manager = pywrapcp.RoutingIndexManager(n, n_vehicles, depot_idx)
     routing = pywrapcp.RoutingModel(manager)
     
-    # Distance callback
-    def distance_callback(from_index, to_index):
-        from_node = manager.IndexToNode(from_index)
-        to_node = manager.IndexToNode(to_index)
-        return int(distance_matrix[from_node, to_node] * 1000)  # Convert to meters (integer)
+    # Transits are registered as precomputed integer tables indexed by node,
+    # so the C++ search never calls back into Python per arc
+    
+    # Arc costs in meters (integer).
+    # Rounded, not truncated, so float32 noise cannot shave a meter off an arc.
+    distance_cost = np.rint(distance_matrix * 1000).astype(np.int64)
     
-    transit_callback_index = routing.RegisterTransitCallback(distance_callback)
+    transit_callback_index = routing.RegisterTransitMatrix(distance_cost.tolist())
     routing.SetArcCostEvaluatorOfAllVehicles(transit_callback_index)
     
     # Add capacity dimension
     use_capacity = vehicle_capacity is not None and df['demand'].sum() > 0
     if use_capacity:
-        def demand_callback(from_index):
-            from_node = manager.IndexToNode(from_index)
-            return int(df.loc[from_node, 'demand'])
-        
-        demand_callback_index = routing.RegisterUnaryTransitCallback(demand_callback)
+        # Demand of the node being left (truncated to whole units)
+        demand_units = df['demand'].to_numpy(dtype=np.float64).astype(np.int64)
+        demand_callback_index = routing.RegisterUnaryTransitVector(demand_units.tolist())
         routing.AddDimension(
             demand_callback_index,
             0,  # null capacity slack
@@ -276,14 +422,10 @@ def run_ortools_solution(
     if use_time:
         max_route_duration = int(max_route_duration_hours * 60) if max_route_duration_hours is not None else 999999
         
-        def time_callback(from_index, to_index):
-            from_node = manager.IndexToNode(from_index)
-            to_node = manager.IndexToNode(to_index)
-            travel_time = int(time_matrix[from_node, to_node])
-            service_time = int(df.loc[from_node, 'service_time'])
-            return travel_time + service_time
-        
-        time_callback_index = routing.RegisterTransitCallback(time_callback)
+        # Whole minutes of travel plus the service time at the node being left
+        service_minutes = df['service_time'].to_numpy(dtype=np.float64).astype(np.int64)
+        time_transit = time_matrix.astype(np.int64) + service_minutes[:, None]
+        time_callback_index = routing.RegisterTransitMatrix(time_transit.tolist())
         
         routing.AddDimension(
             time_callback_index,
@@ -294,23 +436,38 @@ def run_ortools_solution(
         )
         time_dimension = routing.GetDimensionOrDie('Time')
         
-        # Add time window constraints for nodes
-        for node_idx in range(n):
-            index = manager.NodeToIndex(node_idx)
-            earliest = df.loc[node_idx, 'earliest_time']
-            latest = df.loc[node_idx, 'latest_time']
-            
-            if df.loc[node_idx, 'is_depot']:
-                # Depot time window
-                time_dimension.CumulVar(index).SetRange(depot_time_window[0], depot_time_window[1])
-            else:
-                # Customer time windows
-                if earliest is not None and latest is not None:
-                    time_dimension.CumulVar(index).SetRange(earliest, latest)
-                elif earliest is not None:
-                    time_dimension.CumulVar(index).SetMin(earliest)
-                elif latest is not None:
-                    time_dimension.CumulVar(index).SetMax(latest)
+        # Add time window constraints for nodes. A missing bound becomes the
+        # matching end of the dimension's range (0 or max_route_duration),
+        # which leaves that side unconstrained, so every node takes a single
+        # SetRange with plain ints
+        earliest = np.nan_to_num(df['earliest_time'].to_numpy(dtype=np.float64, na_value=np.nan), nan=0)
+        latest = np.nan_to_num(df['latest_time'].to_numpy(dtype=np.float64, na_value=np.nan), nan=max_route_duration)
+        earliest[is_depot] = depot_time_window[0]
+        latest[is_depot] = depot_time_window[1]
+        
+        # A window outside [0, max_route_duration] would empty its cumul
+        # variable, which OR-Tools reports by raising mid-setup
+        if not ((earliest <= latest) & (earliest <= max_route_duration) & (latest >= 0)).all():
+            return {
+                'routes': [],
+                'total_distance': 0,
+                'total_time': 0,
+                'route_details': [],
+                'n_vehicles_used': 0,
+                'error': 'Time windows do not fit within the maximum route duration'
+            }
+        
+        # Only nodes whose window is narrower than the dimension's own range
+        # need a SetRange call; stops without windows are skipped
+        earliest = earliest.astype(np.int64)
+        latest = latest.astype(np.int64)
+        constrained = np.flatnonzero((earliest > 0) | (latest < max_route_duration))
+        cumul_var = time_dimension.CumulVar
+        node_to_index = manager.NodeToIndex
+        for node_idx, node_earliest, node_latest in zip(
+            constrained.tolist(), earliest[constrained].tolist(), latest[constrained].tolist()
+        ):
+            cumul_var(node_to_index(node_idx)).SetRange(node_earliest, node_latest)
         
         # Add depot time window constraints for start/end of routes
         for vehicle_id in range(n_vehicles):
@@ -327,6 +484,7 @@ def run_ortools_solution(
         'PATH_CHEAPEST_ARC': routing_enums_pb2.FirstSolutionStrategy.PATH_CHEAPEST_ARC,
         'PATH_MOST_CONSTRAINED_ARC': routing_enums_pb2.FirstSolutionStrategy.PATH_MOST_CONSTRAINED_ARC,
         'SAVINGS': routing_enums_pb2.FirstSolutionStrategy.SAVINGS,
+        'PARALLEL_CHEAPEST_INSERTION': routing_enums_pb2.FirstSolutionStrategy.PARALLEL_CHEAPEST_INSERTION,
         'SWEEP': routing_enums_pb2.FirstSolutionStrategy.SWEEP,
         'CHRISTOFIDES': routing_enums_pb2.FirstSolutionStrategy.CHRISTOFIDES,
     }
@@ -347,10 +505,25 @@ def run_ortools_solution(
             local_search_metaheuristic,
             routing_enums_pb2.LocalSearchMetaheuristic.GUIDED_LOCAL_SEARCH
         )
-        search_parameters.time_limit.seconds = time_limit_seconds
     
-    # Solve
-    solution = routing.SolveWithParameters(search_parameters)
+    # Always bound the search, including plain local search without a metaheuristic
+    search_parameters.time_limit.seconds = int(time_limit_seconds)
+    
+    # Solve, starting from the warm-start routes when they are feasible here
+    initial_assignment = None
+    if initial_routes:
+        routing.CloseModelWithParameters(search_parameters)
+        warm_routes = [
+            [manager.NodeToIndex(int(node)) for node in route if int(node) != depot_idx]
+            for route in list(initial_routes)[:n_vehicles]
+        ]
+        warm_routes += [[] for _ in range(n_vehicles - len(warm_routes))]
+        initial_assignment = routing.ReadAssignmentFromRoutes(warm_routes, True)
+    
+    if initial_assignment is not None:
+        solution = routing.SolveFromAssignmentWithParameters(initial_assignment, search_parameters)
+    else:
+        solution = routing.SolveWithParameters(search_parameters)
     
     if not solution:
         return {
@@ -364,48 +537,31 @@ def run_ortools_solution(
     
     # Extract solution
     routes = []
-    route_details = []
-    total_distance = 0
-    total_time = 0
+    vehicle_ids = []
     
     for vehicle_id in range(n_vehicles):
         route = []
         index = routing.Start(vehicle_id)
-        route_dist = 0
-        route_time = 0
-        route_demand = 0
         
         while not routing.IsEnd(index):
-            node_idx = manager.IndexToNode(index)
-            route.append(node_idx)
-            previous_index = index
+            route.append(manager.IndexToNode(index))
             index = solution.Value(routing.NextVar(index))
-            
-            if not routing.IsEnd(index):
-                route_dist += distance_matrix[node_idx, manager.IndexToNode(index)]
-                route_time += time_matrix[node_idx, manager.IndexToNode(index)]
         
         # Add end depot
-        node_idx = manager.IndexToNode(index)
-        route.append(node_idx)
-        
-        # Add service times and demands
-        for stop_idx in route[1:-1]:  # Exclude depot at start/end
-            route_time += df.loc[stop_idx, 'service_time']
-            route_demand += df.loc[stop_idx, 'demand']
+        route.append(manager.IndexToNode(index))
         
         if len(route) > 2:  # Only include non-empty routes
             routes.append(route)
-            route_details.append({
-                'vehicle_id': vehicle_id,
-                'stops': route,
-                'distance': route_dist,
-                'time': route_time,
-                'demand': route_demand,
-                'n_stops': len(route) - 2
-            })
-            total_distance += route_dist
-            total_time += route_time
+            vehicle_ids.append(vehicle_id)
+    
+    # As before, the final leg back to the end depot is not counted in
+    # OR-Tools route distance or time
+    route_details, total_distance, total_time = _summarize_routes(
+        routes, vehicle_ids,
+        distance_matrix, time_matrix,
+        df['service_time'].to_numpy(dtype=np.float64), df['demand'].to_numpy(dtype=np.float64),
+        count_return_leg=False,
+    )
     
     return {
         'routes': routes,
@@ -415,3 +571,228 @@ def run_ortools_solution(
         'n_vehicles_used': len(routes)
     }
 
+
+# Multi-start worker pool, created on first use and reused by later calls
+# (e.g. every retry of one auto-relaxation run) instead of spawning fresh
+# interpreters each time; shut down at interpreter exit
+_multistart_pool = None
+_multistart_pool_workers = 0
+_multistart_pool_lock = threading.Lock()
+
+
+def _get_multistart_pool(max_workers: int) -> ProcessPoolExecutor:
+    """Return the shared multi-start pool, (re)creating it for a new worker count."""
+    global _multistart_pool, _multistart_pool_workers
+    with _multistart_pool_lock:
+        if _multistart_pool is None or _multistart_pool_workers != max_workers:
+            if _multistart_pool is not None:
+                _multistart_pool.shutdown(wait=False)
+            # Spawn rather than fork: the caller may be threaded (Streamlit) and
+            # OR-Tools state must not be inherited mid-flight
+            _multistart_pool = ProcessPoolExecutor(
+                max_workers=max_workers,
+                mp_context=multiprocessing.get_context('spawn')
+            )
+            _multistart_pool_workers = max_workers
+        return _multistart_pool
+
+
+def _discard_multistart_pool(pool: ProcessPoolExecutor) -> None:
+    """Forget a broken pool so the next call spawns a new one."""
+    global _multistart_pool
+    with _multistart_pool_lock:
+        if _multistart_pool is pool:
+            _multistart_pool = None
+    pool.shutdown(wait=False)
+
+
+@atexit.register
+def _shutdown_multistart_pool() -> None:
+    """Stop the multi-start workers at interpreter exit."""
+    if _multistart_pool is not None:
+        _multistart_pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _solve_with_strategy(df: pd.DataFrame, specs: Dict, args: tuple, strategy: str) -> Tuple[str, Dict]:
+    """Worker entry point: run the OR-Tools solver with one first-solution strategy."""
+    # Map the caller's shared-memory matrices without copying them
+    blocks = {key: shared_memory.SharedMemory(name=name) for key, (name, _, _) in specs.items()}
+    try:
+        matrices = {
+            key: np.ndarray(shape, dtype=dtype, buffer=blocks[key].buf)
+            for key, (_, shape, dtype) in specs.items()
+        }
+        n_vehicles, vehicle_capacity, max_hours, depot_window, metaheuristic, time_limit, initial_routes = args
+        solution = run_ortools_solution(
+            df, matrices['distance'], matrices['time'], n_vehicles, vehicle_capacity, max_hours,
+            depot_window, strategy, metaheuristic, time_limit, initial_routes
+        )
+        # Drop the views before closing the blocks they point into
+        del matrices
+    finally:
+        for shm in blocks.values():
+            shm.close()
+    return strategy, solution
+
+
+def _to_shared(array: np.ndarray) -> Tuple[shared_memory.SharedMemory, tuple]:
+    """Copy an array into a new shared-memory block; returns (block, (name, shape, dtype))."""
+    array = np.ascontiguousarray(array)
+    shm = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+    np.ndarray(array.shape, dtype=array.dtype, buffer=shm.buf)[...] = array
+    return shm, (shm.name, array.shape, array.dtype.str)
+
+
+def run_multistart_solution(
+    df: pd.DataFrame,
+    distance_matrix: np.ndarray,
+    time_matrix: np.ndarray,
+    n_vehicles: int,
+    vehicle_capacity: Optional[float] = None,
+    max_route_duration_hours: Optional[float] = None,
+    depot_time_window: Tuple[int, int] = (480, 1200),
+    first_solution_strategy: str = 'PATH_CHEAPEST_ARC',
+    local_search_metaheuristic: str = 'GUIDED_LOCAL_SEARCH',
+    time_limit_seconds: int = 30,
+    strategies: Optional[List[str]] = None,
+    max_workers: Optional[int] = None,
+    initial_routes: Optional[List[List[int]]] = None
+) -> Dict:
+    """
+    Run OR-Tools once per first-solution strategy in parallel and keep the shortest result.
+    
+    Takes the same positional arguments as run_ortools_solution, so it can be
+    passed to run_vrp_with_auto_relaxation. Only as many strategies as there
+    are workers are tried, so every one runs at the same time and the wall
+    time stays about time_limit_seconds; with a single worker this is one
+    plain solve in this process. The distance and time matrices are placed
+    in shared memory once per call; the long-lived worker processes map
+    them instead of receiving a pickled copy each.
+    
+    Args:
+        df .. time_limit_seconds: As for run_ortools_solution; first_solution_strategy
+            is always tried first
+        strategies: Further first-solution strategies to try, in order of
+            preference (default: STRATEGIES)
+        max_workers: Worker processes, and so the number of strategies tried
+            (default: one per CPU)
+        initial_routes: Optional warm start shared by every strategy (see run_ortools_solution)
+    
+    Returns:
+        Best solution dictionary, with 'first_solution_strategy' naming the winner
+    """
+    strategies = list(dict.fromkeys([first_solution_strategy] + list(strategies or STRATEGIES)))
+    if max_workers is None:
+        max_workers = os.cpu_count() or 1
+    max_workers = max(1, min(int(max_workers), len(strategies)))
+    # Strategies beyond the worker count would queue behind the others and
+    # multiply the wall time by whole time limits
+    strategies = strategies[:max_workers]
+    args = (n_vehicles, vehicle_capacity, max_route_duration_hours, depot_time_window,
+            local_search_metaheuristic, time_limit_seconds, initial_routes)
+    
+    results = []
+    if max_workers == 1:
+        for strategy in strategies:
+            results.append((strategy, run_ortools_solution(
+                df, distance_matrix, time_matrix, *args[:4], strategy, *args[4:]
+            )))
+    else:
+        distance_shm, distance_spec = _to_shared(distance_matrix)
+        time_shm, time_spec = _to_shared(time_matrix)
+        specs = {'distance': distance_spec, 'time': time_spec}
+        executor = _get_multistart_pool(max_workers)
+        try:
+            futures = [executor.submit(_solve_with_strategy, df, specs, args, s) for s in strategies]
+            for future in as_completed(futures):
+                results.append(future.result())
+        except BrokenProcessPool:
+            _discard_multistart_pool(executor)
+            raise
+        finally:
+            for shm in (distance_shm, time_shm):
+                shm.close()
+                shm.unlink()
+    
+    feasible = [(s, sol) for s, sol in results if 'error' not in sol]
+    if not feasible:
+        # Every strategy failed; report the first strategy's error
+        return dict(results)[strategies[0]]
+    
+    best_strategy, best = min(feasible, key=lambda item: item[1]['total_distance'])
+    best['first_solution_strategy'] = best_strategy
+    return best
+
+
+def _solve_cluster(cluster_id, df: pd.DataFrame, distance_matrix: np.ndarray,
+                   time_matrix: np.ndarray, args: tuple) -> Tuple[object, Dict]:
+    """Worker entry point: run the OR-Tools solver on one cluster."""
+    return cluster_id, run_ortools_solution(df, distance_matrix, time_matrix, *args)
+
+
+def solve_clusters_parallel(
+    cluster_dfs: Dict[int, pd.DataFrame],
+    distance_matrices: Dict[int, np.ndarray],
+    time_matrices: Dict[int, np.ndarray],
+    config: Dict,
+    max_workers: Optional[int] = None
+) -> Dict[int, Dict]:
+    """
+    Solve independent per-cluster VRPs in parallel worker processes.
+    
+    Each cluster gets its own OR-Tools run with the full time limit, so the
+    wall-clock cost is about that of the slowest cluster instead of the sum.
+    The result can be passed straight to clustering.aggregate_cluster_solutions.
+    
+    Args:
+        cluster_dfs: Dict mapping cluster_id to that cluster's stops (with a depot,
+            as from clustering.split_dataframe_by_cluster)
+        distance_matrices, time_matrices: Dicts mapping cluster_id to its matrices
+        config: Solver configuration (same keys as run_vrp_with_auto_relaxation)
+        max_workers: Worker processes (default: one per CPU, capped at the number of clusters)
+    
+    Returns:
+        Dict mapping cluster_id to solution dictionary
+    """
+    args = (
+        config['n_vehicles'],
+        config.get('vehicle_capacity') if config.get('use_capacity') else None,
+        config.get('max_route_duration_hours'),
+        config.get('depot_time_window', (480, 1200)),
+        config.get('first_solution_strategy', 'PATH_CHEAPEST_ARC'),
+        config.get('local_search_metaheuristic', 'GUIDED_LOCAL_SEARCH'),
+        config.get('time_limit_seconds', 30),
+    )
+    if not cluster_dfs:
+        return {}
+    if max_workers is None:
+        max_workers = os.cpu_count() or 1
+    max_workers = max(1, min(int(max_workers), len(cluster_dfs)))
+    
+    if max_workers == 1:
+        return {
+            cluster_id: run_ortools_solution(
+                cluster_df, distance_matrices[cluster_id], time_matrices[cluster_id], *args
+            )
+            for cluster_id, cluster_df in cluster_dfs.items()
+        }
+    
+    solutions = {}
+    # Spawn for the same reason as _get_multistart_pool
+    with ProcessPoolExecutor(
+        max_workers=max_workers,
+        mp_context=multiprocessing.get_context('spawn')
+    ) as executor:
+        futures = [
+            executor.submit(
+                _solve_cluster, cluster_id, cluster_df,
+                distance_matrices[cluster_id], time_matrices[cluster_id], args
+            )
+            for cluster_id, cluster_df in cluster_dfs.items()
+        ]
+        for future in as_completed(futures):
+            cluster_id, solution = future.result()
+            solutions[cluster_id] = solution
+    
+    # Keep the caller's cluster order
+    return {cluster_id: solutions[cluster_id] for cluster_id in cluster_dfs}